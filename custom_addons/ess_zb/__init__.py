@@ -1,2 +1,4 @@
 # __init__.py
-from . import models
\ No newline at end of file
+from . import models
+from . import controllers
+from . import wizard
@@ -14,17 +14,29 @@ Employee Self Attendance with Geolocation & Geofencing
     'author': 'Zingbizz',
     'website': 'https://zingbizz.com',
     'license': 'LGPL-3',
-    'depends': ['hr_attendance', 'web'],
+    'depends': ['hr_attendance', 'web', 'bus'],
     'data': [
         'security/hr_attendance_security.xml',
         'security/ir.model.access.csv',
+        'data/ir_cron_data.xml',
         'views/hr_attendance_views.xml',
         'views/attendance_dashboard.xml',
+        'views/hr_attendance_daily_summary_views.xml',
+        'views/hr_attendance_archive_views.xml',
+        'views/hr_attendance_anomaly_views.xml',
+        'wizard/hr_attendance_export_wizard_views.xml',
+        'wizard/hr_attendance_location_assign_wizard_views.xml',
+        'wizard/hr_attendance_location_import_wizard_views.xml',
     ],
     'assets': {
         'web.assets_backend': [
+            'ess_zb/static/src/js/punch_queue.js',
             'ess_zb/static/src/js/attendance_dashboard.js',
             'ess_zb/static/src/xml/attendance_dashboard.xml',
+            'ess_zb/static/src/js/attendance_heatmap.js',
+            'ess_zb/static/src/xml/attendance_heatmap.xml',
+            'ess_zb/static/src/js/presence_board.js',
+            'ess_zb/static/src/xml/presence_board.xml',
         ],
     },
     'images': ['static/description/icon.png'],
@@ -0,0 +1,100 @@
+# controllers/attendance_export.py
+import csv
+import datetime
+import io
+import tempfile
+
+import xlsxwriter
+
+from odoo import api, http, _
+from odoo.exceptions import AccessError
+from odoo.http import content_disposition, request
+from odoo.modules.registry import Registry
+
+from ..tools.tz import get_datetime_formatter, get_timezone
+
+EXPORT_HEADER = [
+    'Employee', 'Check In', 'Check Out', 'Worked Hours',
+    'Check In Latitude', 'Check In Longitude',
+    'Check Out Latitude', 'Check Out Longitude',
+    'Distance from Office (km)', 'Within Geofence', 'Check-in Location',
+]
+CHUNK_SIZE = 64 * 1024
+
+
+class AttendanceExportController(http.Controller):
+
+    @http.route('/ess_zb/attendance/export', type='http', auth='user', methods=['GET'])
+    def export_attendance(self, date_from, date_to, file_format='csv', **kwargs):
+        """Stream attendances with their GPS data for payroll, as CSV or XLSX"""
+        if not request.env['hr.attendance']._is_user_admin():
+            raise AccessError(_('Only attendance managers can export attendances.'))
+        if file_format not in ('csv', 'xlsx'):
+            return request.not_found()
+
+        tz_name = request.env.user.tz or 'UTC'
+        user_tz = get_timezone(tz_name)
+        bounds = [
+            user_tz.localize(datetime.datetime.combine(datetime.date.fromisoformat(day), datetime.time.min))
+                   .astimezone(datetime.timezone.utc).replace(tzinfo=None)
+            for day in (date_from, date_to)
+        ]
+        # date_to is inclusive
+        bounds[1] += datetime.timedelta(days=1)
+
+        # the request cursor is closed before the body is sent, the stream
+        # reads through its own cursor
+        rows = self._stream_rows(request.env.cr.dbname, request.env.uid, dict(request.env.context), *bounds)
+        filename = 'attendance_%s_%s.%s' % (date_from, date_to, file_format)
+        if file_format == 'csv':
+            body = self._stream_csv(rows, tz_name)
+            content_type = 'text/csv; charset=utf-8'
+        else:
+            body = self._stream_xlsx(rows, tz_name)
+            content_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+        return request.make_response(body, headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', content_disposition(filename)),
+            ('Cache-Control', 'no-store'),
+        ])
+
+    @staticmethod
+    def _stream_rows(dbname, uid, context, date_from, date_to):
+        with Registry(dbname).cursor() as cr:
+            env = api.Environment(cr, uid, context)
+            yield from env['hr.attendance']._iter_export_rows(date_from, date_to)
+
+    @staticmethod
+    def _format_row(row, format_dt):
+        __, employee, check_in, check_out, worked_hours, *coordinates, distance, within, location = row
+        return [
+            employee, format_dt(check_in), format_dt(check_out), round(worked_hours or 0.0, 2),
+            *coordinates, round(distance or 0.0, 2), 'Yes' if within else 'No', location or '',
+        ]
+
+    def _stream_csv(self, rows, tz_name):
+        format_dt = get_datetime_formatter(tz_name)
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_HEADER)
+        for row in rows:
+            writer.writerow(self._format_row(row, format_dt))
+            if buffer.tell() >= CHUNK_SIZE:
+                yield buffer.getvalue().encode()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue().encode()
+
+    def _stream_xlsx(self, rows, tz_name):
+        format_dt = get_datetime_formatter(tz_name)
+        with tempfile.TemporaryFile() as output:
+            # constant_memory flushes every row to a temporary file as it is written
+            workbook = xlsxwriter.Workbook(output, {'constant_memory': True})
+            sheet = workbook.add_worksheet('Attendances')
+            sheet.write_row(0, 0, EXPORT_HEADER, workbook.add_format({'bold': True}))
+            for line, row in enumerate(rows, start=1):
+                sheet.write_row(line, 0, self._format_row(row, format_dt))
+            workbook.close()
+            output.seek(0)
+            while chunk := output.read(CHUNK_SIZE):
+                yield chunk
@@ -2,3 +2,8 @@
 from . import hr_attendance
 from . import hr_attendance_location
 from . import hr_employee
+from . import hr_attendance_daily_summary
+from . import hr_attendance_geocode_cache
+from . import hr_attendance_archive
+from . import ir_websocket
+from . import hr_attendance_anomaly
@@ -1,10 +1,46 @@
 # models/hr_attendance.py
 
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta, timezone
+
+from psycopg2 import IntegrityError
+from psycopg2.errors import UniqueViolation
+
 from odoo import models, fields, api, _
-from odoo.exceptions import ValidationError, UserError
-import math
-from odoo.tools import format_datetime
-import pytz
+from odoo.exceptions import AccessError, ValidationError, UserError
+from odoo.fields import Domain
+from odoo.tools import SQL, format_datetime
+
+from ..tools.geo import (
+    GEOHASH_PRECISION, GeofenceIndex, KM_PER_DEGREE, geohash_encode, geohash_prefixes, haversine_km,
+    haversine_km_pairs,
+)
+from ..tools.perf import NULL_TIMER, stage_timer
+from ..tools.tz import get_datetime_formatter, get_timezone
+
+_logger = logging.getLogger(__name__)
+
+# first key of the per-employee punch advisory locks, the employee id being the second
+PUNCH_LOCK_NAMESPACE = 0x45535a42
+
+# attendance fields the daily summary is aggregated from
+SUMMARY_FIELDS = {'employee_id', 'check_in', 'check_out', 'attendance_location_id', 'distance_from_office'}
+
+# columns written by the history import, with their SQL array element type
+HISTORY_IMPORT_COLUMNS = {
+    'employee_id': 'int4',
+    'check_in': 'timestamp',
+    'check_out': 'timestamp',
+    'check_in_latitude': 'float8',
+    'check_in_longitude': 'float8',
+    'check_out_latitude': 'float8',
+    'check_out_longitude': 'float8',
+    'is_within_geofence': 'bool',
+    'distance_from_office': 'float8',
+    'attendance_location_id': 'int4',
+}
 
 class HrAttendance(models.Model):
     _inherit = 'hr.attendance'
@@ -18,6 +54,25 @@ class HrAttendance(models.Model):
     is_within_geofence = fields.Boolean(string='Within Geofence', default=False)
     distance_from_office = fields.Float(string='Distance from Office (km)', digits=(10, 2))
     attendance_location_id = fields.Many2one('hr.attendance.location', string='Check-in Location')
+    check_in_accuracy = fields.Float(string='Check In GPS Accuracy (m)', digits=(10, 1), readonly=True, copy=False)
+    check_out_accuracy = fields.Float(string='Check Out GPS Accuracy (m)', digits=(10, 1), readonly=True, copy=False)
+    check_in_geohash = fields.Char(
+        string='Check In Geohash', compute='_compute_check_in_geohash', store=True, index=True, copy=False)
+    check_out_geohash = fields.Char(
+        string='Check Out Geohash', compute='_compute_check_out_geohash', store=True, index=True, copy=False)
+    check_in_uuid = fields.Char(string='Check In Client Key', copy=False, readonly=True)
+    check_out_uuid = fields.Char(string='Check Out Client Key', copy=False, readonly=True)
+    check_in_place = fields.Char(string='Check In Place', readonly=True, copy=False)
+    check_out_place = fields.Char(string='Check Out Place', readonly=True, copy=False)
+    geocode_pending = fields.Boolean(
+        string='Reverse Geocoding Pending', compute='_compute_geocode_pending',
+        store=True, readonly=False, copy=False)
+
+    _check_in_uuid_uniq = models.UniqueIndex('(check_in_uuid) WHERE check_in_uuid IS NOT NULL')
+    _check_out_uuid_uniq = models.UniqueIndex('(check_out_uuid) WHERE check_out_uuid IS NOT NULL')
+    _open_attendance_employee_uniq = models.UniqueIndex('(employee_id) WHERE check_out IS NULL')
+    _location_check_in_idx = models.Index('(attendance_location_id, check_in)')
+    _geocode_pending_idx = models.Index('(id) WHERE geocode_pending')
 
     @api.depends('check_in_latitude', 'check_in_longitude')
     def _compute_check_in_location(self):
@@ -35,99 +90,277 @@ class HrAttendance(models.Model):
             else:
                 record.check_out_location = False
 
+    @api.depends('check_in_latitude', 'check_in_longitude')
+    def _compute_check_in_geohash(self):
+        for record in self:
+            if record.check_in_latitude or record.check_in_longitude:
+                record.check_in_geohash = geohash_encode(record.check_in_latitude, record.check_in_longitude)
+            else:
+                record.check_in_geohash = False
+
+    @api.depends('check_out_latitude', 'check_out_longitude')
+    def _compute_check_out_geohash(self):
+        for record in self:
+            if record.check_out_latitude or record.check_out_longitude:
+                record.check_out_geohash = geohash_encode(record.check_out_latitude, record.check_out_longitude)
+            else:
+                record.check_out_geohash = False
+
+    @api.depends('check_in_latitude', 'check_in_longitude', 'check_out_latitude', 'check_out_longitude')
+    def _compute_geocode_pending(self):
+        # places are resolved later by the reverse geocoding cron, never in the punch transaction
+        for record in self:
+            record.geocode_pending = bool(
+                record.check_in_latitude or record.check_in_longitude or
+                record.check_out_latitude or record.check_out_longitude
+            )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        attendances = super().create(vals_list)
+        attendances._mark_daily_summary_dirty()
+        # attendances created closed never reach the presence board
+        attendances.filtered(lambda attendance: not attendance.check_out)._notify_presence('check_in')
+        return attendances
+
+    def write(self, vals):
+        if not SUMMARY_FIELDS.intersection(vals):
+            return super().write(vals)
+        self._mark_daily_summary_dirty()
+        if 'check_out' in vals:
+            changed = self.filtered(lambda attendance: bool(attendance.check_out) != bool(vals['check_out']))
+        res = super().write(vals)
+        self._mark_daily_summary_dirty()
+        if 'check_out' in vals:
+            changed._notify_presence('check_out' if vals['check_out'] else 'check_in')
+        return res
+
+    def unlink(self):
+        self._mark_daily_summary_dirty()
+        return super().unlink()
+
+    def _mark_daily_summary_dirty(self):
+        """Queue the (employee, local day) summary rows of these attendances for refresh at commit"""
+        keys = {
+            (attendance.employee_id.id, attendance.check_in.replace(tzinfo=timezone.utc).astimezone(
+                get_timezone(attendance.employee_id.tz)).date())
+            for attendance in self.sudo()
+            if attendance.employee_id and attendance.check_in
+        }
+        if not keys:
+            return
+        precommit = self.env.cr.precommit
+        pending = precommit.data.get('ess_zb.summary_keys')
+        if pending is None:
+            pending = precommit.data['ess_zb.summary_keys'] = set()
+
+            @precommit.add
+            def refresh_daily_summary():
+                self.env['hr.attendance.daily.summary'].sudo()._refresh(
+                    precommit.data.pop('ess_zb.summary_keys', set()))
+        pending.update(keys)
+
     def _calculate_distance(self, lat1, lon1, lat2, lon2):
         """Calculate distance between two coordinates using Haversine formula"""
-        R = 6371  # Earth's radius in kilometers
-        dlat = math.radians(lat2 - lat1)
-        dlon = math.radians(lon2 - lon1)
-        a = (math.sin(dlat / 2) * math.sin(dlat / 2) +
-             math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
-             math.sin(dlon / 2) * math.sin(dlon / 2))
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-        distance = R * c
-        return distance
+        return haversine_km(lat1, lon1, lat2, lon2)
 
     def _is_user_admin(self):
         """Check if current user is an administrator"""
-        return self.env.user.has_group('hr_attendance.group_hr_attendance_manager') or \
-               self.env.user.has_group('base.group_system')
+        return self.env.user.has_groups('hr_attendance.group_hr_attendance_manager,base.group_system')
 
-    def _validate_geofence(self, latitude, longitude, employee):
-        """Validate if coordinates are within allowed geofence for specific employee"""
-        assigned_locations = employee.attendance_location_ids.filtered(lambda l: l.active)
+    def _get_punch_user(self):
+        """Resolve the employee and admin flag of the current user once per request"""
+        employee = self.env.user.employee_id
+        if not employee:
+            raise UserError(_('No employee linked to this user.'))
+        return employee, self._is_user_admin()
+
+    def _get_employee_geofence_index(self, employee, company_id=None):
+        """Return the geofence index holding the locations an employee may check in at
+        
+        :param company_id: company whose company-wide locations are the fallback,
+                           the current company by default
+        """
+        return self.env['hr.employee']._get_attendance_geofence_index(employee.id, company_id or self.env.company.id)
+
+    def _get_max_gps_accuracy(self):
+        """Largest GPS accuracy radius (m) accepted for a check-in, 0 for no limit"""
+        return float(self.env['ir.config_parameter'].sudo().get_param('ess_zb.max_gps_accuracy_m', 100))
+
+    def _validate_geofence(self, latitude, longitude, employee, accuracy=None):
+        """Validate if coordinates are within allowed geofence for specific employee
         
-        if not assigned_locations:
-            assigned_locations = self.env['hr.attendance.location'].sudo().search([
-                ('company_id', '=', self.env.company.id),
-                ('active', '=', True),
-                ('employee_ids', '=', False)
-            ])
+        ``accuracy`` is the radius (m) of the client fix; fixes less precise than
+        ``ess_zb.max_gps_accuracy_m`` are refused before any geometry is computed.
+        """
+        max_accuracy = self._get_max_gps_accuracy()
+        if accuracy and max_accuracy and accuracy > max_accuracy:
+            raise UserError(_(
+                'Your location is too imprecise (within %(accuracy)d m, %(max_accuracy)d m at most). '
+                'Please wait for a better GPS signal and try again.',
+                accuracy=accuracy, max_accuracy=max_accuracy,
+            ))
+        index = self._get_employee_geofence_index(employee)
         
-        if not assigned_locations:
+        is_valid, distance, location_id = index.locate(latitude, longitude)
+        if location_id is None:
             return False, 0, None
         
-        for location in assigned_locations:
-            distance = self._calculate_distance(
-                latitude, longitude,
-                location.latitude, location.longitude
-            )
-            if distance <= location.radius_km:
-                return True, distance, location
-        
-        nearest_distance = float('inf')
-        nearest_location = None
-        for location in assigned_locations:
-            distance = self._calculate_distance(
-                latitude, longitude,
-                location.latitude, location.longitude
-            )
-            if distance < nearest_distance:
-                nearest_distance = distance
-                nearest_location = location
+        return is_valid, distance, self.env['hr.attendance.location'].sudo().browse(location_id)
+
+    @api.model
+    def validate_geofence_batch(self, points, employee_ids):
+        """Validate many coordinates at once against the geofences of their employees
+        
+        :param points: list of ``(latitude, longitude)`` pairs
+        :param employee_ids: list of employee ids, one per point
+        :return: list of dicts with ``is_within_geofence``, ``distance`` and
+                 ``location_id`` (containing location, else the nearest one)
+        """
+        if not self._is_user_admin():
+            raise AccessError(_('Only attendance managers can validate coordinates in batch.'))
+        if len(points) != len(employee_ids):
+            raise UserError(_('Each point must have a matching employee.'))
+        return self._validate_geofence_batch(points, employee_ids)
+
+    def _validate_geofence_batch(self, points, employee_ids):
+        employees = self.env['hr.employee'].sudo().browse(set(employee_ids))
+        # the points are not taken by the current user, fall back on the company of each employee
+        index_by_employee = {
+            employee.id: self._get_employee_geofence_index(employee, employee.company_id.id)
+            for employee in employees
+        }
+        
+        # employees sharing the company-wide index are evaluated together
+        groups = {}
+        for position, employee_id in enumerate(employee_ids):
+            index = index_by_employee[employee_id]
+            groups.setdefault(id(index), (index, []))[1].append(position)
         
-        return False, nearest_distance, nearest_location
+        results = [None] * len(points)
+        for index, positions in groups.values():
+            located = index.locate_many(
+                [points[position][0] for position in positions],
+                [points[position][1] for position in positions],
+            )
+            for position, (is_valid, distance, location_id) in zip(positions, located):
+                results[position] = {
+                    'is_within_geofence': bool(is_valid),
+                    'distance': distance if location_id else 0,
+                    'location_id': location_id or False,
+                }
+        return results
 
     def _format_datetime_user_tz(self, dt):
         """Format datetime in user's timezone"""
         if not dt:
             return False
         
-        tz = self.env.user.tz or 'UTC'
-        
         try:
-            if dt.tzinfo is None:
-                utc_dt = pytz.UTC.localize(dt)
-            else:
-                utc_dt = dt
-            
-            user_tz = pytz.timezone(tz)
-            local_dt = utc_dt.astimezone(user_tz)
-            
-            return local_dt.strftime('%Y-%m-%d %I:%M:%S %p')
+            return get_datetime_formatter(self.env.user.tz or 'UTC')(dt)
         except Exception as e:
             return format_datetime(self.env, dt, dt_format='yyyy-MM-dd hh:mm:ss a')
 
+    def _lock_employee_punches(self, employee_ids, wait=True):
+        """Take the punch advisory locks of the employees until the end of the transaction
+        
+        Locks are taken in id order so that concurrent batches cannot deadlock.
+        
+        :param wait: block until the locks are free, otherwise give up at once
+        :return: whether all the locks were acquired
+        """
+        employee_ids = sorted(set(employee_ids))
+        if not employee_ids:
+            return True
+        lock = SQL('pg_advisory_xact_lock') if wait else SQL('pg_try_advisory_xact_lock')
+        self.env.cr.execute(SQL(
+            """
+            SELECT %(lock)s(%(namespace)s, k.employee_id)
+              FROM unnest(%(employee_ids)s::int[]) WITH ORDINALITY AS k(employee_id, position)
+          ORDER BY k.position
+            """,
+            lock=lock, namespace=PUNCH_LOCK_NAMESPACE, employee_ids=employee_ids,
+        ))
+        return wait or all(acquired for acquired, in self.env.cr.fetchall())
+
+    def _get_max_offline_punch_age(self):
+        """Hours a punch queued offline may be replayed after its capture"""
+        return float(self.env['ir.config_parameter'].sudo().get_param('ess_zb.max_offline_punch_age_h', 72))
+
+    def _check_in_result(self, attendance, is_admin):
+        location = attendance.attendance_location_id
+        return {
+            'id': attendance.id,
+            'employee_id': attendance.employee_id.id,
+            'check_in': self._format_datetime_user_tz(attendance.check_in),
+            'is_within_geofence': True,
+            'location_name': location.name if location else 'Admin Override',
+            'is_admin': is_admin,
+        }
+
+    def _check_out_result(self, attendance, is_admin):
+        return {
+            'id': attendance.id,
+            'check_out': self._format_datetime_user_tz(attendance.check_out),
+            'worked_hours': attendance.worked_hours,
+            'is_admin': is_admin,
+        }
+
     @api.model
-    def employee_check_in(self, latitude=None, longitude=None):
-        """Method for employee to check in with location and geofencing"""
-        employee = self.env.user.employee_id
-        if not employee:
-            raise UserError(_('No employee linked to this user.'))
+    def employee_check_in(self, latitude=None, longitude=None, client_uuid=None, accuracy=None):
+        """Method for employee to check in with location and geofencing
         
-        is_admin = self._is_user_admin()
+        The punch is recorded at the server time; punches queued offline are
+        replayed with their capture time through :meth:`ingest_punches`.
+        ``client_uuid`` makes the call idempotent: replaying a punch that was
+        already recorded returns the existing attendance. ``accuracy`` is the
+        accuracy radius in meters reported by the client for the coordinates.
+        """
+        employee, is_admin = self._get_punch_user()
+        timer = stage_timer('employee_check_in', self.env)
+        try:
+            return self._employee_check_in(
+                employee, is_admin, latitude, longitude, client_uuid, timer, accuracy=accuracy)
+        finally:
+            timer.log()
+
+    def _employee_check_in(self, employee, is_admin, latitude, longitude, client_uuid=None, timer=NULL_TIMER,
+                           accuracy=None):
+        if client_uuid:
+            replayed = self.sudo().search([
+                ('employee_id', '=', employee.id),
+                ('check_in_uuid', '=', client_uuid),
+            ], limit=1)
+            if replayed:
+                return self._check_in_result(replayed, is_admin)
         
         if not is_admin and (not latitude or not longitude):
             raise UserError(_('Location is required for check-in. Please enable GPS/location services.'))
         
+        with timer.stage('open_attendance'):
+            if employee.sudo().current_attendance_id:
+                raise UserError(_('You are already checked in.'))
+            # double taps and retries of the same punch: only one may proceed
+            if not self._lock_employee_punches(employee.ids, wait=False):
+                raise UserError(_('Your previous punch is still being recorded. Please try again in a moment.'))
+        
         distance = 0
         location = None
         
         if not is_admin:
             if latitude and longitude:
-                is_valid, distance, location = self._validate_geofence(latitude, longitude, employee)
+                with timer.stage('geofence'):
+                    is_valid, distance, location = self._validate_geofence(latitude, longitude, employee, accuracy)
                 
                 if not is_valid:
-                    if location:
+                    polygon = location._get_polygon() if location else None
+                    if polygon:
+                        raise UserError(
+                            _('You are outside the %s geofence (%.2f km from its boundary). '
+                              'Please check in within its area.') %
+                            (location.name, polygon.distance_km(latitude, longitude))
+                        )
+                    elif location:
                         raise UserError(
                             _('You are %.2f km away from %s. Please check in within %.2f km radius.') %
                             (distance, location.name, location.radius_km)
@@ -135,21 +368,13 @@ class HrAttendance(models.Model):
                     else:
                         raise UserError(_('No attendance locations configured. Contact your HR manager.'))
         
-        attendance_sudo = self.sudo()
-        
-        existing_open = attendance_sudo.search([
-            ('employee_id', '=', employee.id),
-            ('check_out', '=', False)
-        ], limit=1)
-        
-        if existing_open:
-            raise UserError(_('You are already checked in.'))
-        
         vals = {
             'employee_id': employee.id,
             'check_in': fields.Datetime.now(),
+            'check_in_uuid': client_uuid or False,
             'check_in_latitude': latitude if latitude else 0.0,
             'check_in_longitude': longitude if longitude else 0.0,
+            'check_in_accuracy': accuracy or 0.0,
             'is_within_geofence': True,
             'distance_from_office': distance,
         }
@@ -157,76 +382,888 @@ class HrAttendance(models.Model):
         if location:
             vals['attendance_location_id'] = location.id
         
-        attendance = attendance_sudo.create(vals)
+        with timer.stage('create'):
+            try:
+                with self.env.cr.savepoint():
+                    attendance = self.sudo().create(vals)
+            except UniqueViolation:
+                # opened by a transaction that committed after ours took its snapshot
+                raise UserError(_('You are already checked in.'))
+        timer.flush()
         
-        return {
-            'id': attendance.id,
-            'employee_id': attendance.employee_id.id,
-            'check_in': self._format_datetime_user_tz(attendance.check_in),
-            'is_within_geofence': True,
-            'location_name': location.name if location else 'Admin Override',
-            'is_admin': is_admin,
-        }
+        return self._check_in_result(attendance, is_admin)
 
     @api.model
-    def employee_check_out(self, latitude=None, longitude=None):
-        """Method for employee to check out with location"""
-        employee = self.env.user.employee_id
-        if not employee:
-            raise UserError(_('No employee linked to this user.'))
+    def employee_check_out(self, latitude=None, longitude=None, client_uuid=None, accuracy=None):
+        """Method for employee to check out with location
         
-        is_admin = self._is_user_admin()
+        ``client_uuid`` and ``accuracy`` behave as in :meth:`employee_check_in`.
+        """
+        employee, is_admin = self._get_punch_user()
+        timer = stage_timer('employee_check_out', self.env)
+        try:
+            return self._employee_check_out(
+                employee, is_admin, latitude, longitude, client_uuid, timer, accuracy=accuracy)
+        finally:
+            timer.log()
+
+    def _employee_check_out(self, employee, is_admin, latitude, longitude, client_uuid=None, timer=NULL_TIMER,
+                            accuracy=None):
+        if client_uuid:
+            replayed = self.sudo().search([
+                ('employee_id', '=', employee.id),
+                ('check_out_uuid', '=', client_uuid),
+            ], limit=1)
+            if replayed:
+                return self._check_out_result(replayed, is_admin)
         
         if not is_admin and (not latitude or not longitude):
             raise UserError(_('Location is required for check-out. Please enable GPS/location services.'))
         
-        attendance_sudo = self.sudo()
-        
-        attendance = attendance_sudo.search([
-            ('employee_id', '=', employee.id),
-            ('check_out', '=', False)
-        ], limit=1)
-        
-        if not attendance:
-            raise UserError(_('You are not checked in.'))
+        with timer.stage('open_attendance'):
+            attendance = employee.sudo().current_attendance_id
+            if not attendance:
+                raise UserError(_('You are not checked in.'))
+            if not self._lock_employee_punches(employee.ids, wait=False):
+                raise UserError(_('Your previous punch is still being recorded. Please try again in a moment.'))
         
         vals = {
-            'check_out': fields.Datetime.now(),
+            'check_out': max(fields.Datetime.now(), attendance.check_in),
+            'check_out_uuid': client_uuid or False,
             'check_out_latitude': latitude if latitude else 0.0,
             'check_out_longitude': longitude if longitude else 0.0,
+            'check_out_accuracy': accuracy or 0.0,
         }
         
-        attendance.write(vals)
+        with timer.stage('write'):
+            attendance.write(vals)
+        timer.flush()
+        
+        return self._check_out_result(attendance, is_admin)
+
+    @api.model
+    def employee_punch(self, action, latitude=None, longitude=None, client_uuid=None, accuracy=None):
+        """Check in or out and return the refreshed dashboard state in a single call
         
+        :param action: ``check_in`` or ``check_out``
+        :return: dict with the punch ``result`` and the dashboard ``status``
+        """
+        employee, is_admin = self._get_punch_user()
+        timer = stage_timer('employee_punch', self.env)
+        try:
+            if action == 'check_in':
+                result = self._employee_check_in(
+                    employee, is_admin, latitude, longitude, client_uuid, timer, accuracy=accuracy)
+            elif action == 'check_out':
+                result = self._employee_check_out(
+                    employee, is_admin, latitude, longitude, client_uuid, timer, accuracy=accuracy)
+            else:
+                raise UserError(_('Invalid punch type.'))
+            with timer.stage('status'):
+                status = self._get_attendance_status(employee, is_admin)
+        finally:
+            timer.log(action=action)
         return {
-            'id': attendance.id,
-            'check_out': self._format_datetime_user_tz(attendance.check_out),
-            'worked_hours': attendance.worked_hours,
+            'result': result,
+            'status': status,
+        }
+
+    def _get_attendance_status(self, employee, is_admin):
+        attendance = employee.sudo().current_attendance_id
+        return {
+            'employee_id': employee.id,
+            'employee_name': employee.name,
+            'is_checked_in': bool(attendance),
+            'check_in_time': self._format_datetime_user_tz(attendance.check_in) if attendance else False,
+            'attendance_id': attendance.id if attendance else False,
             'is_admin': is_admin,
+            'max_gps_accuracy_m': self._get_max_gps_accuracy(),
         }
 
     @api.model
     def get_employee_attendance_status(self):
         """Get current attendance status for logged-in employee"""
         try:
+            timer = stage_timer('get_employee_attendance_status', self.env)
             employee = self.env.user.employee_id
             if not employee:
                 return {'error': 'No employee linked to this user'}
             
-            attendance = self.sudo().search([
-                ('employee_id', '=', employee.id),
-                ('check_out', '=', False)
-            ], limit=1)
-            
-            return {
-                'employee_name': employee.name,
-                'is_checked_in': bool(attendance),
-                'check_in_time': self._format_datetime_user_tz(attendance.check_in) if attendance else False,
-                'attendance_id': attendance.id if attendance else False,
-                'is_admin': self._is_user_admin(),
-            }
+            with timer.stage('status'):
+                status = self._get_attendance_status(employee, self._is_user_admin())
+            timer.log()
+            return status
         except Exception as e:
-            import logging
-            _logger = logging.getLogger(__name__)
             _logger.error(f"Error in get_employee_attendance_status: {str(e)}")
             return {'error': str(e)}
+
+    def _notify_presence(self, event):
+        """Push ``check_in`` or ``check_out`` events of these attendances to the presence board
+        
+        One bus notification is sent per company, on the ``(company, 'ess_zb_presence')``
+        channel managers are subscribed to; it is only delivered if the transaction commits.
+        """
+        events = defaultdict(list)
+        for attendance in self.sudo():
+            employee = attendance.employee_id
+            events[employee.company_id].append({
+                'event': event,
+                'attendance_id': attendance.id,
+                'employee_id': employee.id,
+                'employee_name': employee.name,
+                'location_id': attendance.attendance_location_id.id,
+                'check_in': fields.Datetime.to_string(attendance.check_in),
+            })
+        for company, company_events in events.items():
+            self.env['bus.bus']._sendone((company, 'ess_zb_presence'), 'ess_zb_presence', {
+                'company_id': company.id,
+                'events': company_events,
+            })
+
+    @api.model
+    def get_presence_board(self):
+        """People currently checked in, per attendance location, in one aggregated query
+        
+        The board then stays current by applying the ``ess_zb_presence`` bus events.
+        
+        :return: dict with the ``company_ids`` of the board and its ``locations``, a list of
+                 dicts with ``id``, ``name`` and the ``people`` checked in there; people
+                 checked in outside of any location are listed under ``id`` False
+        """
+        if not self._is_user_admin():
+            raise AccessError(_('Only attendance managers can see who is in.'))
+        company_ids = self.env.companies.ids
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            """
+            WITH present AS (
+                SELECT a.attendance_location_id AS location_id,
+                       json_agg(json_build_object(
+                           'attendance_id', a.id,
+                           'employee_id', a.employee_id,
+                           'employee_name', e.name,
+                           'check_in', to_char(a.check_in, 'YYYY-MM-DD HH24:MI:SS')
+                       ) ORDER BY a.check_in) AS people
+                  FROM hr_attendance a
+                  JOIN hr_employee e ON e.id = a.employee_id
+                 WHERE a.check_out IS NULL
+                   AND e.company_id = ANY(%(company_ids)s)
+              GROUP BY a.attendance_location_id
+            ), board AS (
+                SELECT id, name
+                  FROM hr_attendance_location
+                 WHERE active
+                   AND (company_id IS NULL OR company_id = ANY(%(company_ids)s))
+            )
+            SELECT b.id, b.name, COALESCE(p.people, '[]'::json)
+              FROM board b
+         LEFT JOIN present p ON p.location_id = b.id
+             UNION ALL
+            SELECT p.location_id, l.name, p.people
+              FROM present p
+         LEFT JOIN hr_attendance_location l ON l.id = p.location_id
+             WHERE NOT EXISTS (SELECT 1 FROM board b WHERE b.id = p.location_id)
+            """,
+            company_ids=company_ids,
+        ))
+        locations = [
+            {'id': location_id or False, 'name': name or _('No Location'), 'people': people}
+            for location_id, name, people in self.env.cr.fetchall()
+        ]
+        locations.sort(key=lambda location: (not location['id'], location['name']))
+        return {'company_ids': company_ids, 'locations': locations}
+
+    @api.model
+    def ingest_punches(self, punches):
+        """Record a batch of timestamped punches, e.g. uploaded by a kiosk or a mobile client
+        
+        :param punches: list of dicts with ``employee_id``, ``type`` (``check_in`` or
+                        ``check_out``), ``timestamp`` (UTC) and optional ``latitude``,
+                        ``longitude``, ``accuracy`` and ``client_uuid``; punches whose
+                        ``client_uuid`` was already recorded are acknowledged
+                        without being applied again, punches captured more than
+                        ``ess_zb.max_offline_punch_age_h`` hours ago are rejected
+        :return: list of dicts, one per punch, with ``status`` (``ok`` or ``error``),
+                 ``attendance_id`` and ``message``
+        """
+        timer = stage_timer('ingest_punches', self.env)
+        is_admin = self._is_user_admin()
+        own_employee_id = self.env.user.employee_id.id
+        max_accuracy = self._get_max_gps_accuracy()
+        now = fields.Datetime.now()
+        max_age = self._get_max_offline_punch_age()
+        oldest = now - timedelta(hours=max_age)
+        results = [None] * len(punches)
+        
+        def fail(position, message):
+            results[position] = {'status': 'error', 'attendance_id': False, 'message': message}
+        
+        def succeed(positions, attendance):
+            for position in positions:
+                results[position] = {'status': 'ok', 'attendance_id': attendance.id, 'message': False}
+        
+        client_uuids = [punch.get('client_uuid') for punch in punches]
+        recorded = {}
+        if any(client_uuids):
+            keys = [key for key in client_uuids if key]
+            for attendance in self.sudo().search_fetch([
+                '|', ('check_in_uuid', 'in', keys), ('check_out_uuid', 'in', keys),
+            ], ['employee_id', 'check_in_uuid', 'check_out_uuid']):
+                if attendance.employee_id.id == own_employee_id or is_admin:
+                    recorded[attendance.check_in_uuid] = attendance
+                    recorded[attendance.check_out_uuid] = attendance
+        
+        accepted = []
+        seen_uuids = set()
+        for position, punch in enumerate(punches):
+            client_uuid = client_uuids[position]
+            if client_uuid and client_uuid in recorded:
+                succeed([position], recorded[client_uuid])
+                continue
+            if client_uuid and client_uuid in seen_uuids:
+                fail(position, _('Duplicate punch.'))
+                continue
+            seen_uuids.add(client_uuid)
+            try:
+                employee_id = int(punch['employee_id'])
+                timestamp = fields.Datetime.to_datetime(punch.get('timestamp')) or now
+                latitude = float(punch.get('latitude') or 0.0)
+                longitude = float(punch.get('longitude') or 0.0)
+                accuracy = float(punch.get('accuracy') or 0.0)
+            except (KeyError, TypeError, ValueError):
+                fail(position, _('Invalid punch data.'))
+                continue
+            if punch.get('type') not in ('check_in', 'check_out'):
+                fail(position, _('Invalid punch type.'))
+            elif not is_admin and employee_id != own_employee_id:
+                fail(position, _('You can only record your own attendance.'))
+            elif timestamp > now:
+                fail(position, _('Punch time is in the future.'))
+            elif timestamp < oldest:
+                fail(position, _('Punches can only be recorded up to %(hours)g hours after they were taken.',
+                                 hours=max_age))
+            elif not is_admin and (not latitude or not longitude):
+                fail(position, _('Location is required. Please enable GPS/location services.'))
+            elif not is_admin and punch['type'] == 'check_in' and max_accuracy and accuracy > max_accuracy:
+                fail(position, _('Location too imprecise (within %(accuracy)d m, %(max_accuracy)d m at most).',
+                                 accuracy=accuracy, max_accuracy=max_accuracy))
+            else:
+                accepted.append((
+                    timestamp, position, punch['type'], employee_id, latitude, longitude, client_uuid or False, accuracy,
+                ))
+        
+        employees = self.env['hr.employee'].sudo().browse({punch[3] for punch in accepted}).exists()
+        known_employee_ids = set(employees.ids)
+        for punch in accepted:
+            if punch[3] not in known_employee_ids:
+                fail(punch[1], _('Unknown employee.'))
+        accepted = [punch for punch in accepted if punch[3] in known_employee_ids]
+        
+        located = [punch for punch in accepted if punch[2] == 'check_in' and punch[4] and punch[5]]
+        with timer.stage('geofence'):
+            geofence = dict(zip(
+                [punch[1] for punch in located],
+                self._validate_geofence_batch(
+                    [(punch[4], punch[5]) for punch in located],
+                    [punch[3] for punch in located],
+                ),
+            ))
+        
+        with timer.stage('open_attendance'):
+            self._lock_employee_punches(employees.ids)
+            current = {
+                employee.id: employee.current_attendance_id
+                for employee in employees
+            }
+        
+        # replay punches in time order; attendances opened within the batch
+        # are kept as pending ([positions], vals) until the grouped create
+        to_create = []
+        to_close = []
+        locations = self.env['hr.attendance.location'].sudo()
+        for timestamp, position, punch_type, employee_id, latitude, longitude, client_uuid, accuracy in sorted(accepted):
+            open_attendance = current.get(employee_id)
+            pending = isinstance(open_attendance, tuple)
+            if punch_type == 'check_in':
+                if open_attendance:
+                    fail(position, _('Already checked in.'))
+                    continue
+                check = geofence.get(position)
+                if check and not check['is_within_geofence']:
+                    location = locations.browse(check['location_id'])
+                    polygon = location._get_polygon() if location else None
+                    if polygon:
+                        fail(position, _('Outside the %s geofence (%.2f km from its boundary).') %
+                             (location.name, polygon.distance_km(latitude, longitude)))
+                    elif location:
+                        fail(position, _('%.2f km away from %s (allowed radius %.2f km).') %
+                             (check['distance'], location.name, location.radius_km))
+                    else:
+                        fail(position, _('No attendance locations configured.'))
+                    continue
+                vals = {
+                    'employee_id': employee_id,
+                    'check_in': timestamp,
+                    'check_in_latitude': latitude,
+                    'check_in_longitude': longitude,
+                    'check_in_uuid': client_uuid,
+                    'check_in_accuracy': accuracy,
+                    'is_within_geofence': True,
+                    'distance_from_office': check['distance'] if check else 0,
+                }
+                if check and check['location_id']:
+                    vals['attendance_location_id'] = check['location_id']
+                current[employee_id] = ([position], vals)
+                to_create.append(current[employee_id])
+            else:
+                if not open_attendance:
+                    fail(position, _('Not checked in.'))
+                    continue
+                check_in = open_attendance[1]['check_in'] if pending else open_attendance.check_in
+                if timestamp < check_in:
+                    fail(position, _('Check-out is earlier than check-in.'))
+                    continue
+                vals = {
+                    'check_out': timestamp,
+                    'check_out_latitude': latitude,
+                    'check_out_longitude': longitude,
+                    'check_out_uuid': client_uuid,
+                    'check_out_accuracy': accuracy,
+                }
+                if pending:
+                    open_attendance[0].append(position)
+                    open_attendance[1].update(vals)
+                else:
+                    to_close.append((position, open_attendance, vals))
+                current[employee_id] = None
+        
+        # close existing attendances first so that new check-ins cannot overlap them
+        with timer.stage('close'):
+            self._ingest_close(to_close, succeed, fail)
+        with timer.stage('create'):
+            self._ingest_create(to_create, succeed, fail)
+        timer.flush()
+        timer.log(punches=len(punches))
+        return results
+
+    def _ingest_close(self, to_close, succeed, fail):
+        """Write the check-outs of open attendances; return the closed attendances"""
+        closed = self.sudo()
+        for position, attendance, vals in to_close:
+            try:
+                with self.env.cr.savepoint():
+                    attendance.write(vals)
+            except (UserError, ValidationError) as e:
+                fail(position, str(e))
+            else:
+                succeed([position], attendance)
+                closed |= attendance
+        return closed
+
+    def _ingest_create(self, to_create, succeed, fail):
+        """Create the attendances opened by the batch; return the created attendances"""
+        attendance_sudo = self.sudo()
+        if not to_create:
+            return attendance_sudo
+        try:
+            with self.env.cr.savepoint():
+                attendances = attendance_sudo.create([vals for __, vals in to_create])
+        except (UserError, ValidationError, IntegrityError):
+            # isolate the offending punches
+            attendances = attendance_sudo
+            for positions, vals in to_create:
+                try:
+                    with self.env.cr.savepoint():
+                        attendance = attendance_sudo.create(vals)
+                except (UserError, ValidationError) as e:
+                    for position in positions:
+                        fail(position, str(e))
+                except IntegrityError:
+                    for position in positions:
+                        fail(position, _('Already checked in.'))
+                else:
+                    succeed(positions, attendance)
+                    attendances |= attendance
+        else:
+            for (positions, __), attendance in zip(to_create, attendances):
+                succeed(positions, attendance)
+        return attendances
+
+    @api.model
+    def search_punches_near(self, latitude, longitude, radius_km, date_from=None, date_to=None, limit=None):
+        """Check-ins and check-outs taken within ``radius_km`` of a point, live and archived
+        
+        Candidates are narrowed down with prefix ranges on the indexed geohash
+        columns, then exact distances are only computed for them.
+        
+        :param date_from: optional UTC lower bound (inclusive) of the punch time
+        :param date_to: optional UTC upper bound (exclusive) of the punch time
+        :return: list of dicts with ``attendance_id`` (False once archived),
+                 ``archive_id``, ``employee_id``, ``punch`` (``check_in`` or
+                 ``check_out``), ``time`` and ``distance_km``, nearest first
+        """
+        if not self._is_user_admin():
+            raise AccessError(_('Only attendance managers can search punches by location.'))
+        prefixes = geohash_prefixes(latitude, longitude, radius_km)
+        self.env.flush_all()
+        branches = []
+        for table, source in (('hr_attendance', 'live'), ('hr_attendance_archive', 'archive')):
+            for punch in ('check_in', 'check_out'):
+                geohash = SQL.identifier(f'{punch}_geohash')
+                punch_time = SQL.identifier(punch)
+                conditions = [SQL('(%s)', SQL(' OR ').join(
+                    SQL('%s BETWEEN %s AND %s', geohash, prefix, prefix + 'z' * (GEOHASH_PRECISION - len(prefix)))
+                    for prefix in prefixes
+                ))]
+                if date_from:
+                    conditions.append(SQL('%s >= %s', punch_time, date_from))
+                if date_to:
+                    conditions.append(SQL('%s < %s', punch_time, date_to))
+                branches.append(SQL(
+                    "SELECT %s, id, employee_id, %s, %s, %s, %s FROM %s WHERE %s",
+                    source, punch, punch_time, SQL.identifier(f'{punch}_latitude'), SQL.identifier(f'{punch}_longitude'),
+                    SQL.identifier(table), SQL(' AND ').join(conditions),
+                ))
+        self.env.cr.execute(SQL(' UNION ALL ').join(branches))
+        candidates = self.env.cr.fetchall()
+        distances = haversine_km_pairs(
+            [candidate[5] for candidate in candidates], [candidate[6] for candidate in candidates],
+            [latitude] * len(candidates), [longitude] * len(candidates),
+        )
+        punches = sorted((
+            (distance, candidate) for candidate, distance in zip(candidates, distances)
+            if distance <= radius_km
+        ), key=lambda punch: punch[0])
+        return [{
+            'attendance_id': record_id if source == 'live' else False,
+            'archive_id': record_id if source == 'archive' else False,
+            'employee_id': employee_id,
+            'punch': punch,
+            'time': fields.Datetime.to_string(punched_at),
+            'distance_km': distance,
+        } for distance, (source, record_id, employee_id, punch, punched_at, __, __) in punches[:limit]]
+
+    @api.model
+    def _search(self, domain, *args, **kwargs):
+        excluded_ids = self.env.context.get('ess_zb_location_auto_check_out_ids')
+        if excluded_ids:
+            domain = Domain.AND([domain, [('id', 'not in', excluded_ids)]])
+        return super()._search(domain, *args, **kwargs)
+
+    @api.model
+    def _cron_auto_check_out(self):
+        """Leave the attendances checked in at a location with its own delay to
+        :meth:`_cron_close_stale_attendances`
+
+        Only these open attendances are hidden from the core cron, by id, so
+        that it cannot pick them as candidates. The closed attendances of the
+        same locations still count in the worked time and overtime it computes.
+        """
+        self.env.flush_all()
+        self.env.cr.execute(SQL(
+            """
+            SELECT a.id
+              FROM hr_attendance a
+              JOIN hr_attendance_location l ON l.id = a.attendance_location_id
+             WHERE a.check_out IS NULL
+               AND l.auto_checkout_hours > 0
+            """
+        ))
+        excluded_ids = [row[0] for row in self.env.cr.fetchall()]
+        return super(HrAttendance, self.with_context(ess_zb_location_auto_check_out_ids=excluded_ids))._cron_auto_check_out()
+
+    @api.model
+    def _cron_close_stale_attendances(self, batch_size=1000):
+        """Close the attendances left open longer than the auto check-out delay of their location
+        
+        Attendances are closed at check-in plus the ``auto_checkout_hours`` of
+        their check-in location; the others are left to the company automatic
+        check-out of hr_attendance. Each chunk of ``batch_size`` attendances is
+        closed with one UPDATE, skipping rows locked by a punch in progress,
+        then worked hours and the employee pointers are recomputed set-based at
+        the flush, overtime is updated once for the chunk and the chunk is
+        committed.
+        """
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self.env.flush_all()
+        while True:
+            self.env.cr.execute(SQL(
+                """
+                WITH stale AS (
+                    SELECT a.id, a.check_in + make_interval(secs => l.auto_checkout_hours * 3600) AS check_out
+                      FROM hr_attendance a
+                      JOIN hr_attendance_location l ON l.id = a.attendance_location_id
+                     WHERE a.check_out IS NULL
+                       AND l.auto_checkout_hours > 0
+                       AND a.check_in + make_interval(secs => l.auto_checkout_hours * 3600) < NOW() AT TIME ZONE 'UTC'
+                  ORDER BY a.id
+                     LIMIT %(limit)s
+                       FOR UPDATE OF a SKIP LOCKED
+                )
+                UPDATE hr_attendance a
+                   SET check_out = stale.check_out, out_mode = 'auto_check_out',
+                       write_uid = %(uid)s, write_date = NOW() AT TIME ZONE 'UTC'
+                  FROM stale
+                 WHERE a.id = stale.id
+             RETURNING a.id
+                """,
+                limit=batch_size, uid=self.env.uid,
+            ))
+            attendances = self.sudo().browse([row[0] for row in self.env.cr.fetchall()])
+            if not attendances:
+                break
+            attendances.invalidate_recordset(['check_out', 'out_mode', 'write_uid', 'write_date'])
+            attendances.modified(['check_out'])
+            attendances._mark_daily_summary_dirty()
+            # write() is bypassed, so is its presence event
+            attendances._notify_presence('check_out')
+            self.env.flush_all()
+            # the UPDATE bypasses write(), which keeps the overtime of the employees up to date
+            attendances._update_overtime()
+            self.env.flush_all()
+            if auto_commit:
+                self.env.cr.commit()
+            self.env.invalidate_all()
+            if len(attendances) < batch_size:
+                break
+
+    def _iter_export_rows(self, date_from, date_to, batch_size=2000):
+        """Yield payroll export rows for attendances checked in within ``[date_from, date_to)``
+        
+        Archived attendances are exported first, then the live ones. Each table
+        is read with keyset pagination on its id so that only one batch is held
+        in memory at a time, whatever the size of the period. Each row is
+        ``(id, employee, check_in, check_out, worked_hours, check_in_latitude,
+        check_in_longitude, check_out_latitude, check_out_longitude,
+        distance_from_office, is_within_geofence, location)``, ``id`` being
+        the id in its own table.
+        """
+        for table in ('hr_attendance_archive', 'hr_attendance'):
+            last_id = 0
+            while True:
+                self.env.cr.execute(SQL(
+                    """
+                    SELECT a.id, e.name, a.check_in, a.check_out, a.worked_hours,
+                           a.check_in_latitude, a.check_in_longitude,
+                           a.check_out_latitude, a.check_out_longitude,
+                           a.distance_from_office, a.is_within_geofence, l.name
+                      FROM %(table)s a
+                      JOIN hr_employee e ON e.id = a.employee_id
+                 LEFT JOIN hr_attendance_location l ON l.id = a.attendance_location_id
+                     WHERE a.check_in >= %(date_from)s
+                       AND a.check_in < %(date_to)s
+                       AND e.company_id IN %(company_ids)s
+                       AND a.id > %(last_id)s
+                  ORDER BY a.id
+                     LIMIT %(limit)s
+                    """,
+                    table=SQL.identifier(table),
+                    date_from=date_from,
+                    date_to=date_to,
+                    company_ids=tuple(self.env.companies.ids),
+                    last_id=last_id,
+                    limit=batch_size,
+                ))
+                rows = self.env.cr.fetchall()
+                if not rows:
+                    break
+                yield from rows
+                last_id = rows[-1][0]
+
+    @api.model
+    def get_check_in_heatmap(self, location_id, date_from, date_to, cell_m=25):
+        """Bin the check-in coordinates recorded at a location into a grid, in SQL
+        
+        The grid covers three times the location's radius (or its polygon
+        bounding box) around it. Archived attendances are binned as well.
+        Only non-empty cells are returned, as a flat
+        ``[row, col, count, row, col, count, ...]`` array.
+        
+        :param date_from: inclusive lower bound on ``check_in`` (UTC)
+        :param date_to: exclusive upper bound on ``check_in`` (UTC)
+        :param cell_m: cell size in meters
+        """
+        if not self._is_user_admin():
+            raise AccessError(_('Only attendance managers can view check-in heatmaps.'))
+        location = self.env['hr.attendance.location'].browse(location_id).exists()
+        if not location:
+            raise UserError(_('Attendance location not found.'))
+        cell_m = min(max(float(cell_m), 5.0), 1000.0)
+        
+        polygon = location._get_polygon()
+        if polygon:
+            min_lat, max_lat = polygon.min_lat, polygon.max_lat
+            min_lon, max_lon = polygon.min_lon, polygon.max_lon
+            pad_lat, pad_lon = (max_lat - min_lat) / 2, (max_lon - min_lon) / 2
+        else:
+            pad_lat, pad_lon = GeofenceIndex.circle_extent(location.latitude, location.radius_km * 3)
+            min_lat = max_lat = location.latitude
+            min_lon = max_lon = location.longitude
+        min_lat, max_lat = max(min_lat - pad_lat, -90), min(max_lat + pad_lat, 90)
+        min_lon, max_lon = max(min_lon - pad_lon, -180), min(max_lon + pad_lon, 180)
+        
+        cell_lat = cell_m / 1000 / KM_PER_DEGREE
+        __, cell_lon = GeofenceIndex.circle_extent(location.latitude, cell_m / 1000)
+        rows = max(int((max_lat - min_lat) / cell_lat) + 1, 1)
+        cols = max(int((max_lon - min_lon) / cell_lon) + 1, 1)
+        
+        branches = [SQL(
+            """
+            SELECT check_in_latitude, check_in_longitude
+              FROM %(table)s
+             WHERE attendance_location_id = %(location_id)s
+               AND check_in >= %(date_from)s
+               AND check_in < %(date_to)s
+               AND check_in_latitude BETWEEN %(min_lat)s AND %(max_lat)s
+               AND check_in_longitude BETWEEN %(min_lon)s AND %(max_lon)s
+            """,
+            table=SQL.identifier(table),
+            location_id=location.id,
+            date_from=fields.Datetime.to_datetime(date_from),
+            date_to=fields.Datetime.to_datetime(date_to),
+            min_lat=min_lat, max_lat=max_lat, min_lon=min_lon, max_lon=max_lon,
+        ) for table in ('hr_attendance', 'hr_attendance_archive')]
+        self.env.cr.execute(SQL(
+            """
+            SELECT FLOOR((a.check_in_latitude - %(min_lat)s) / %(cell_lat)s)::int AS row,
+                   FLOOR((a.check_in_longitude - %(min_lon)s) / %(cell_lon)s)::int AS col,
+                   COUNT(*)
+              FROM (%(punches)s) a
+          GROUP BY 1, 2
+            """,
+            punches=SQL(' UNION ALL ').join(branches),
+            min_lat=min_lat, min_lon=min_lon, cell_lat=cell_lat, cell_lon=cell_lon,
+        ))
+        cells = []
+        total = peak = 0
+        for row, col, count in self.env.cr.fetchall():
+            cells.extend((min(row, rows - 1), min(col, cols - 1), count))
+            total += count
+            peak = max(peak, count)
+        
+        return {
+            'location': {
+                'id': location.id,
+                'name': location.name,
+                'latitude': location.latitude,
+                'longitude': location.longitude,
+                'radius_km': location.radius_km,
+            },
+            'origin': [min_lat, min_lon],
+            'cell': [cell_lat, cell_lon],
+            'cell_m': cell_m,
+            'rows': rows,
+            'cols': cols,
+            'cells': cells,
+            'total': total,
+            'max': peak,
+        }
+
+    @api.model
+    def _cron_reverse_geocode(self, batch_size=1000):
+        """Resolve the coordinates of pending attendances into place names
+        
+        The provider is chosen with the ``ess_zb.geocoder_provider`` system
+        parameter and implemented by a ``_reverse_geocode_<provider>`` method.
+        Results are cached per rounded coordinate in
+        ``hr.attendance.geocode.cache``, trimmed to ``ess_zb.geocoder_cache_size``
+        entries.
+        """
+        ICP = self.env['ir.config_parameter'].sudo()
+        provider = ICP.get_param('ess_zb.geocoder_provider', 'locations')
+        resolver = getattr(self, '_reverse_geocode_%s' % provider, None)
+        if resolver is None:
+            _logger.warning("Unknown reverse geocoding provider %r", provider)
+            return
+        
+        attendances = self.sudo().search([('geocode_pending', '=', True)], order='id', limit=batch_size)
+        Cache = self.env['hr.attendance.geocode.cache'].sudo()
+        
+        def point_key(latitude, longitude):
+            if not (latitude or longitude):
+                return None
+            return Cache._point_key(latitude, longitude)
+        
+        keyed = [
+            (attendance.id,
+             point_key(attendance.check_in_latitude, attendance.check_in_longitude),
+             point_key(attendance.check_out_latitude, attendance.check_out_longitude))
+            for attendance in attendances
+        ]
+        points = {}
+        for attendance in attendances:
+            for latitude, longitude in ((attendance.check_in_latitude, attendance.check_in_longitude),
+                                        (attendance.check_out_latitude, attendance.check_out_longitude)):
+                key = point_key(latitude, longitude)
+                if key:
+                    points.setdefault(key, (latitude, longitude))
+        
+        places = Cache._lookup(provider, list(points))
+        missing = {key: point for key, point in points.items() if key not in places}
+        if missing:
+            resolved = resolver(missing)
+            Cache._store(provider, resolved)
+            places.update(resolved)
+        
+        # attendances resolving to the same places are written together
+        groups = {}
+        for attendance_id, check_in_key, check_out_key in keyed:
+            groups.setdefault((places.get(check_in_key), places.get(check_out_key)), []).append(attendance_id)
+        for (check_in_place, check_out_place), attendance_ids in groups.items():
+            self.sudo().browse(attendance_ids).write({
+                'check_in_place': check_in_place or False,
+                'check_out_place': check_out_place or False,
+                'geocode_pending': False,
+            })
+        
+        Cache._evict(int(ICP.get_param('ess_zb.geocoder_cache_size', 100000)))
+        if len(attendances) == batch_size:
+            self.env.ref('ess_zb.ir_cron_attendance_reverse_geocode')._trigger()
+
+    def _reverse_geocode_locations(self, points):
+        """Offline provider naming the nearest configured attendance location
+        
+        :param points: ``{key: (latitude, longitude)}``
+        :return: ``{key: place}``
+        """
+        locations = self.env['hr.attendance.location'].sudo().search_fetch(
+            [], ['name', 'latitude', 'longitude', 'radius_km', 'geofence_type', 'polygon_geojson'])
+        index = GeofenceIndex(locations._get_geofence_entries())
+        names = dict(zip(locations.ids, locations.mapped('name')))
+        places = {}
+        for key, (latitude, longitude) in points.items():
+            is_within, distance, location_id = index.locate(latitude, longitude)
+            if location_id is None:
+                places[key] = False
+            elif is_within:
+                places[key] = names[location_id]
+            else:
+                places[key] = _('%(distance).1f km from %(location)s', distance=distance, location=names[location_id])
+        return places
+
+    def _get_history_import_defaults(self):
+        """Default values of the plain stored fields not set explicitly by the history import"""
+        skipped = set(HISTORY_IMPORT_COLUMNS) | {'id', 'create_uid', 'create_date', 'write_uid', 'write_date'}
+        names = [
+            name for name, field in self._fields.items()
+            if field.store and field.column_type and not field.compute and not field.related
+            and field.type in ('char', 'selection', 'boolean', 'integer', 'float', 'many2one')
+            and name not in skipped
+        ]
+        return {name: value for name, value in self.default_get(names).items() if value is not False}
+
+    @api.model
+    def import_attendance_history(self, rows, batch_size=5000):
+        """Bulk import historical attendances, bypassing the per-record create path
+        
+        Each chunk of ``batch_size`` rows is validated, geofenced through the
+        vectorized batch validation, inserted with a single ``INSERT ... SELECT
+        FROM unnest(...)`` and only then are the stored computes (location
+        strings, worked hours, employee pointers, ...) marked and computed
+        set-based at the chunk flush. Overlapping attendances are not checked.
+        
+        :param rows: list of dicts with ``employee_id``, ``check_in``, optional
+                     ``check_out`` (UTC) and optional check-in/check-out coordinates
+        :return: dict with the number of ``imported`` rows and ``errors`` as
+                 ``(row index, message)`` pairs
+        """
+        if not self._is_user_admin():
+            raise AccessError(_('Only attendance managers can import attendance history.'))
+        defaults = self._get_history_import_defaults()
+        imported = 0
+        errors = []
+        for start in range(0, len(rows), batch_size):
+            count, chunk_errors = self._import_history_chunk(rows[start:start + batch_size], start, defaults)
+            imported += count
+            errors += chunk_errors
+        return {'imported': imported, 'errors': errors}
+
+    def _import_history_chunk(self, rows, offset, defaults):
+        errors = []
+        parsed = []
+        for position, row in enumerate(rows, start=offset):
+            try:
+                check_in = fields.Datetime.to_datetime(row['check_in'])
+                check_out = fields.Datetime.to_datetime(row.get('check_out')) or None
+                parsed.append((
+                    position, int(row['employee_id']), check_in, check_out,
+                    float(row.get('check_in_latitude') or 0.0), float(row.get('check_in_longitude') or 0.0),
+                    float(row.get('check_out_latitude') or 0.0), float(row.get('check_out_longitude') or 0.0),
+                ))
+            except (KeyError, TypeError, ValueError):
+                errors.append((position, _('Invalid attendance data.')))
+                continue
+            if not check_in:
+                errors.append((position, _('Check-in time is required.')))
+                parsed.pop()
+            elif check_out and check_out < check_in:
+                errors.append((position, _('Check-out is earlier than check-in.')))
+                parsed.pop()
+        
+        known_employee_ids = set(self.env['hr.employee'].sudo().browse({row[1] for row in parsed}).exists().ids)
+        errors += [(row[0], _('Unknown employee.')) for row in parsed if row[1] not in known_employee_ids]
+        parsed = [row for row in parsed if row[1] in known_employee_ids]
+        
+        # at most one open attendance per employee, as enforced by the unique index
+        open_employee_ids = set(self.sudo().search_fetch([
+            ('employee_id', 'in', list({row[1] for row in parsed if not row[3]})),
+            ('check_out', '=', False),
+        ], ['employee_id']).employee_id.ids)
+        kept = []
+        for row in parsed:
+            if not row[3] and row[1] in open_employee_ids:
+                errors.append((row[0], _('The employee already has an open attendance.')))
+                continue
+            if not row[3]:
+                open_employee_ids.add(row[1])
+            kept.append(row)
+        parsed = kept
+        if not parsed:
+            return 0, errors
+        
+        located = [index for index, row in enumerate(parsed) if row[4] or row[5]]
+        geofence = dict(zip(located, self._validate_geofence_batch(
+            [(parsed[index][4], parsed[index][5]) for index in located],
+            [parsed[index][1] for index in located],
+        )))
+        no_check = {'is_within_geofence': False, 'distance': 0.0, 'location_id': False}
+        checks = [geofence.get(index, no_check) for index in range(len(parsed))]
+        
+        columns = dict(zip(HISTORY_IMPORT_COLUMNS, (
+            [row[1] for row in parsed],
+            [row[2] for row in parsed],
+            [row[3] for row in parsed],
+            [row[4] for row in parsed],
+            [row[5] for row in parsed],
+            [row[6] for row in parsed],
+            [row[7] for row in parsed],
+            [check['is_within_geofence'] for check in checks],
+            [check['distance'] for check in checks],
+            [check['location_id'] or None for check in checks],
+        )))
+        constants = dict(defaults, create_uid=self.env.uid, write_uid=self.env.uid)
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO hr_attendance (%(columns)s, create_date, write_date)
+            SELECT u.*, %(constants)s, NOW() AT TIME ZONE 'UTC', NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(arrays)s) AS u
+         RETURNING id
+            """,
+            columns=SQL(', ').join(SQL.identifier(name) for name in list(columns) + list(constants)),
+            constants=SQL(', ').join(SQL('%s', value) for value in constants.values()),
+            arrays=SQL(', ').join(
+                SQL('%s::' + HISTORY_IMPORT_COLUMNS[name] + '[]', values)
+                for name, values in columns.items()
+            ),
+        ))
+        attendances = self.browse([row[0] for row in self.env.cr.fetchall()])
+        
+        # the deferred, set-based recompute of everything the ORM create would have computed
+        for field in self._fields.values():
+            if field.compute and field.store:
+                self.env.add_to_compute(field, attendances)
+        attendances.modified(self._fields, create=True)
+        attendances._mark_daily_summary_dirty()
+        self.env.flush_all()
+        self.env.invalidate_all()
+        return len(attendances), errors
@@ -0,0 +1,180 @@
+# models/hr_attendance_anomaly.py
+import threading
+from datetime import datetime, time, timedelta
+
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+from ..tools.geo import haversine_km_pairs
+
+# consecutive punches closer than this are GPS jitter, whatever their speed
+AUDIT_MIN_TRAVEL_KM = 1.0
+# floor on the time between two punches, so that simultaneous punches get a finite speed
+AUDIT_MIN_TRAVEL_HOURS = 1 / 60
+
+
+class HrAttendanceAnomaly(models.Model):
+    _name = 'hr.attendance.anomaly'
+    _description = 'Attendance Anomaly'
+    _order = 'date desc, id desc'
+
+    # cleared when the attendance is archived, the finding is then traced by original_attendance_id
+    attendance_id = fields.Many2one('hr.attendance', string='Attendance', readonly=True,
+                                    index=True, ondelete='set null')
+    original_attendance_id = fields.Integer(string='Original Attendance ID', required=True, readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, readonly=True,
+                                  index=True, ondelete='cascade')
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    date = fields.Date(string='Audited Day', required=True, readonly=True, index=True)
+    anomaly_type = fields.Selection([
+        ('check_out_outside', 'Check-out Outside Geofence'),
+        ('impossible_travel', 'Impossible Travel'),
+    ], string='Anomaly', required=True, readonly=True)
+    distance_km = fields.Float(string='Distance (km)', digits=(10, 2), readonly=True, aggregator='max')
+    speed_kmh = fields.Float(string='Speed (km/h)', digits=(10, 1), readonly=True, aggregator='max')
+    state = fields.Selection([
+        ('new', 'To Review'),
+        ('confirmed', 'Confirmed'),
+        ('dismissed', 'Dismissed'),
+    ], string='Status', required=True, default='new', index=True)
+
+    _attendance_type_uniq = models.UniqueIndex('(original_attendance_id, anomaly_type)')
+
+    def action_confirm(self):
+        self.write({'state': 'confirmed'})
+
+    def action_dismiss(self):
+        self.write({'state': 'dismissed'})
+
+    @api.model
+    def _cron_audit_attendances(self, day=None, batch_size=20000):
+        """Audit the punches checked in on ``day`` (UTC, yesterday by default)
+
+        Attendances are streamed per employee and check-in time with keyset
+        pagination, so that memory is bounded by ``batch_size`` whatever the
+        number of employees. Each chunk is audited with vectorized distance
+        computations, its findings are inserted and the chunk is committed.
+        Running the audit again for the same day does not duplicate findings.
+        """
+        day = fields.Date.to_date(day) or fields.Date.subtract(fields.Date.today(), days=1)
+        start = datetime.combine(day, time.min)
+        max_speed = float(self.env['ir.config_parameter'].sudo().get_param('ess_zb.audit_max_speed_kmh', 200))
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        geofences = self._get_audit_geofences()
+        self.env.flush_all()
+        key = (0, start, 0)
+        previous = None
+        while True:
+            self.env.cr.execute(SQL(
+                """
+                SELECT a.id, a.employee_id, e.company_id, a.check_in, a.check_out,
+                       a.check_in_latitude, a.check_in_longitude,
+                       a.check_out_latitude, a.check_out_longitude, a.attendance_location_id
+                  FROM hr_attendance a
+                  JOIN hr_employee e ON e.id = a.employee_id
+                 WHERE a.check_in >= %(start)s AND a.check_in < %(end)s
+                   AND (a.employee_id, a.check_in, a.id) > (%(employee_id)s, %(check_in)s, %(id)s)
+              ORDER BY a.employee_id, a.check_in, a.id
+                 LIMIT %(limit)s
+                """,
+                start=start, end=start + timedelta(days=1),
+                employee_id=key[0], check_in=key[1], id=key[2], limit=batch_size,
+            ))
+            rows = self.env.cr.fetchall()
+            if not rows:
+                break
+            findings, previous = self._audit_chunk(rows, previous, geofences, max_speed)
+            self._store_findings(findings, day)
+            if auto_commit:
+                self.env.cr.commit()
+            key = (rows[-1][1], rows[-1][3], rows[-1][0])
+            if len(rows) < batch_size:
+                break
+        self.invalidate_model()
+
+    def _get_audit_geofences(self):
+        """``{location_id: (latitude, longitude, radius_km, polygon or None)}`` of every location"""
+        locations = self.env['hr.attendance.location'].sudo().with_context(active_test=False).search_fetch(
+            [], ['latitude', 'longitude', 'radius_km', 'geofence_type', 'polygon_geojson'])
+        return {
+            location.id: (location.latitude, location.longitude, location.radius_km, location._get_polygon())
+            for location in locations
+        }
+
+    def _audit_chunk(self, rows, previous, geofences, max_speed):
+        """Flag the anomalies of a chunk of attendances sorted by employee and check-in
+
+        :param previous: last located punch of the previous chunk, to measure the
+                         travel towards the first punch of this one
+        :return: list of findings ``(attendance_id, employee_id, company_id, type,
+                 distance_km, speed_kmh)`` and the last located punch of the chunk
+        """
+        findings = []
+
+        # check-out against the geofence of the check-in location
+        closed = [
+            row for row in rows
+            if row[4] and (row[7] or row[8]) and row[9] in geofences
+        ]
+        distances = haversine_km_pairs(
+            [row[7] for row in closed], [row[8] for row in closed],
+            [geofences[row[9]][0] for row in closed], [geofences[row[9]][1] for row in closed],
+        )
+        for row, distance in zip(closed, distances):
+            __, __, radius_km, polygon = geofences[row[9]]
+            outside = not polygon.contains(row[7], row[8]) if polygon else distance > radius_km
+            if outside:
+                findings.append((row[0], row[1], row[2], 'check_out_outside', distance, 0.0))
+
+        # travel speed between consecutive located punches of an employee
+        punches = [previous] if previous else []
+        for row in rows:
+            if row[5] or row[6]:
+                punches.append((row[0], row[1], row[2], row[3], row[5], row[6]))
+            if row[4] and (row[7] or row[8]):
+                punches.append((row[0], row[1], row[2], row[4], row[7], row[8]))
+        pairs = [
+            (before, after) for before, after in zip(punches, punches[1:])
+            if before[1] == after[1]
+        ]
+        distances = haversine_km_pairs(
+            [before[4] for before, __ in pairs], [before[5] for before, __ in pairs],
+            [after[4] for __, after in pairs], [after[5] for __, after in pairs],
+        )
+        for (before, after), distance in zip(pairs, distances):
+            if distance < AUDIT_MIN_TRAVEL_KM:
+                continue
+            hours = max((after[3] - before[3]).total_seconds() / 3600, AUDIT_MIN_TRAVEL_HOURS)
+            speed = distance / hours
+            if speed > max_speed:
+                findings.append((after[0], after[1], after[2], 'impossible_travel', distance, speed))
+
+        return findings, punches[-1] if punches else previous
+
+    def _store_findings(self, findings, day):
+        if not findings:
+            return
+        # an attendance can be reached too fast and left too fast, keep the fastest
+        unique = {}
+        for finding in findings:
+            key = (finding[0], finding[3])
+            if key not in unique or finding[5] > unique[key][5]:
+                unique[key] = finding
+        columns = list(zip(*unique.values()))
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO hr_attendance_anomaly (
+                attendance_id, employee_id, company_id, anomaly_type, distance_km, speed_kmh,
+                original_attendance_id, date, state, create_uid, create_date, write_uid, write_date)
+            SELECT u.*, u.attendance_id, %(day)s, 'new',
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%(attendance_ids)s::int[], %(employee_ids)s::int[], %(company_ids)s::int[],
+                          %(types)s::varchar[], %(distances)s::float8[], %(speeds)s::float8[])
+                   AS u(attendance_id, employee_id, company_id, anomaly_type, distance_km, speed_kmh)
+                ON CONFLICT (original_attendance_id, anomaly_type) DO NOTHING
+            """,
+            attendance_ids=list(columns[0]), employee_ids=list(columns[1]),
+            company_ids=[company_id or None for company_id in columns[2]], types=list(columns[3]),
+            distances=list(columns[4]), speeds=list(columns[5]),
+            day=day, uid=self.env.uid,
+        ))
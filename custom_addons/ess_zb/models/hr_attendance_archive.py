@@ -0,0 +1,125 @@
+# models/hr_attendance_archive.py
+import threading
+
+from odoo import models, fields, api, tools
+from odoo.tools import SQL
+
+# hr_attendance columns carried over to the archive, GPS data included
+ARCHIVED_COLUMNS = [
+    'employee_id', 'check_in', 'check_out', 'worked_hours',
+    'check_in_latitude', 'check_in_longitude', 'check_out_latitude', 'check_out_longitude',
+    'check_in_accuracy', 'check_out_accuracy', 'check_in_geohash', 'check_out_geohash',
+    'check_in_location', 'check_out_location', 'check_in_place', 'check_out_place',
+    'is_within_geofence', 'distance_from_office', 'attendance_location_id',
+]
+
+
+class HrAttendanceArchive(models.Model):
+    _name = 'hr.attendance.archive'
+    _description = 'Archived Attendance'
+    _order = 'check_in desc'
+    _log_access = False
+
+    original_id = fields.Integer(string='Original Attendance ID', readonly=True, index=True)
+    archived_on = fields.Datetime(string='Archived On', readonly=True)
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True, index=True, ondelete='cascade')
+    check_in = fields.Datetime(string='Check In', readonly=True, index=True)
+    check_out = fields.Datetime(string='Check Out', readonly=True)
+    worked_hours = fields.Float(string='Worked Hours', readonly=True)
+    check_in_latitude = fields.Float(string='Check In Latitude', digits=(10, 7), readonly=True)
+    check_in_longitude = fields.Float(string='Check In Longitude', digits=(10, 7), readonly=True)
+    check_out_latitude = fields.Float(string='Check Out Latitude', digits=(10, 7), readonly=True)
+    check_out_longitude = fields.Float(string='Check Out Longitude', digits=(10, 7), readonly=True)
+    check_in_accuracy = fields.Float(string='Check In GPS Accuracy (m)', digits=(10, 1), readonly=True)
+    check_out_accuracy = fields.Float(string='Check Out GPS Accuracy (m)', digits=(10, 1), readonly=True)
+    check_in_geohash = fields.Char(string='Check In Geohash', readonly=True, index=True)
+    check_out_geohash = fields.Char(string='Check Out Geohash', readonly=True, index=True)
+    check_in_location = fields.Char(string='Check In Location', readonly=True)
+    check_out_location = fields.Char(string='Check Out Location', readonly=True)
+    check_in_place = fields.Char(string='Check In Place', readonly=True)
+    check_out_place = fields.Char(string='Check Out Place', readonly=True)
+    is_within_geofence = fields.Boolean(string='Within Geofence', readonly=True)
+    distance_from_office = fields.Float(string='Distance from Office (km)', digits=(10, 2), readonly=True)
+    attendance_location_id = fields.Many2one('hr.attendance.location', string='Check-in Location', readonly=True, ondelete='set null')
+
+    @api.model
+    def _cron_archive_attendances(self, batch_size=10000):
+        """Move closed attendances older than ``ess_zb.archive_horizon_days`` to the archive
+        
+        Every chunk is moved by a single DELETE ... RETURNING feeding an INSERT
+        and committed on its own. The last attendance of each employee stays in
+        place as the base module keeps a pointer to it.
+        """
+        horizon_days = int(self.env['ir.config_parameter'].sudo().get_param('ess_zb.archive_horizon_days', 365))
+        if horizon_days <= 0:
+            return
+        cutoff = fields.Datetime.subtract(fields.Datetime.now(), days=horizon_days)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        self.env.flush_all()
+        columns = SQL(', ').join(SQL.identifier(column) for column in ARCHIVED_COLUMNS)
+        while True:
+            self.env.cr.execute(SQL(
+                """
+                WITH moved AS (
+                    DELETE FROM hr_attendance
+                     WHERE id IN (
+                        SELECT a.id
+                          FROM hr_attendance a
+                         WHERE a.check_out IS NOT NULL
+                           AND a.check_out < %(cutoff)s
+                           AND NOT EXISTS (SELECT 1 FROM hr_employee e WHERE e.last_attendance_id = a.id)
+                      ORDER BY a.id
+                         LIMIT %(limit)s
+                           FOR UPDATE SKIP LOCKED)
+                 RETURNING id, %(columns)s
+                )
+                INSERT INTO hr_attendance_archive (original_id, archived_on, %(columns)s)
+                SELECT id, NOW() AT TIME ZONE 'UTC', %(columns)s FROM moved
+                """,
+                cutoff=cutoff, limit=batch_size, columns=columns,
+            ))
+            moved = self.env.cr.rowcount
+            if auto_commit:
+                self.env.cr.commit()
+            if moved < batch_size:
+                break
+        self.env.invalidate_all()
+
+
+class HrAttendanceReportAll(models.Model):
+    _name = 'hr.attendance.report.all'
+    _description = 'Attendances Including Archive'
+    _auto = False
+    _order = 'check_in desc'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', readonly=True)
+    check_in = fields.Datetime(string='Check In', readonly=True)
+    check_out = fields.Datetime(string='Check Out', readonly=True)
+    worked_hours = fields.Float(string='Worked Hours', readonly=True, aggregator='sum')
+    check_in_latitude = fields.Float(string='Check In Latitude', digits=(10, 7), readonly=True, aggregator=None)
+    check_in_longitude = fields.Float(string='Check In Longitude', digits=(10, 7), readonly=True, aggregator=None)
+    check_out_latitude = fields.Float(string='Check Out Latitude', digits=(10, 7), readonly=True, aggregator=None)
+    check_out_longitude = fields.Float(string='Check Out Longitude', digits=(10, 7), readonly=True, aggregator=None)
+    check_in_place = fields.Char(string='Check In Place', readonly=True)
+    check_out_place = fields.Char(string='Check Out Place', readonly=True)
+    is_within_geofence = fields.Boolean(string='Within Geofence', readonly=True)
+    distance_from_office = fields.Float(string='Distance from Office (km)', digits=(10, 2), readonly=True, aggregator='avg')
+    attendance_location_id = fields.Many2one('hr.attendance.location', string='Check-in Location', readonly=True)
+    is_archived = fields.Boolean(string='Archived', readonly=True)
+
+    def init(self):
+        columns = SQL(', ').join(SQL.identifier(column) for column in ARCHIVED_COLUMNS)
+        tools.drop_view_if_exists(self.env.cr, self._table)
+        # even ids for live attendances, odd ids for archived ones
+        self.env.cr.execute(SQL(
+            """
+            CREATE OR REPLACE VIEW %(view)s AS (
+                SELECT id * 2 AS id, %(columns)s, FALSE AS is_archived
+                  FROM hr_attendance
+                 UNION ALL
+                SELECT id * 2 + 1 AS id, %(columns)s, TRUE AS is_archived
+                  FROM hr_attendance_archive
+            )
+            """,
+            view=SQL.identifier(self._table), columns=columns,
+        ))
@@ -0,0 +1,108 @@
+# models/hr_attendance_daily_summary.py
+from odoo import models, fields, api, _
+from odoo.exceptions import AccessError
+from odoo.tools import SQL
+
+
+class HrAttendanceDailySummary(models.Model):
+    _name = 'hr.attendance.daily.summary'
+    _description = 'Daily Attendance Summary'
+    _order = 'date desc, employee_id'
+
+    employee_id = fields.Many2one('hr.employee', string='Employee', required=True, readonly=True, index=True, ondelete='cascade')
+    date = fields.Date(string='Day', required=True, readonly=True, index=True)
+    location_id = fields.Many2one('hr.attendance.location', string='Location', readonly=True, ondelete='set null')
+    company_id = fields.Many2one('res.company', string='Company', readonly=True)
+    first_check_in = fields.Datetime(string='First Check In', readonly=True)
+    last_check_out = fields.Datetime(string='Last Check Out', readonly=True)
+    worked_hours = fields.Float(string='Worked Hours', readonly=True, aggregator='sum')
+    punch_count = fields.Integer(string='Attendances', readonly=True, aggregator='sum')
+    distance_min = fields.Float(string='Min Distance (km)', digits=(10, 2), readonly=True, aggregator='min')
+    distance_max = fields.Float(string='Max Distance (km)', digits=(10, 2), readonly=True, aggregator='max')
+    distance_avg = fields.Float(string='Avg Distance (km)', digits=(10, 2), readonly=True, aggregator='avg')
+
+    _employee_day_location_uniq = models.UniqueIndex('(employee_id, date, COALESCE(location_id, 0))')
+
+    def _aggregate_query(self, keys=None):
+        """INSERT ... SELECT aggregating attendances per employee, local day and location
+        
+        Live and archived attendances are aggregated together, since a day can
+        be split between them when the last attendance of an employee stays live.
+        
+        :param keys: optional list of ``(employee_id, date)`` to restrict the aggregation to
+        """
+        source = SQL(
+            """
+            (SELECT employee_id, check_in, check_out, worked_hours, distance_from_office, attendance_location_id
+               FROM hr_attendance
+              UNION ALL
+             SELECT employee_id, check_in, check_out, worked_hours, distance_from_office, attendance_location_id
+               FROM hr_attendance_archive)
+            """
+        )
+        local_day = SQL("(a.check_in AT TIME ZONE 'UTC' AT TIME ZONE COALESCE(r.tz, 'UTC'))::date")
+        restrict = SQL()
+        if keys:
+            employee_ids, days = zip(*keys)
+            restrict = SQL(
+                """
+                JOIN unnest(%(employee_ids)s::int[], %(days)s::date[]) AS k(employee_id, day)
+                  ON k.employee_id = a.employee_id AND k.day = %(local_day)s
+                """,
+                employee_ids=list(employee_ids), days=list(days), local_day=local_day,
+            )
+        return SQL(
+            """
+            INSERT INTO hr_attendance_daily_summary (
+                employee_id, date, location_id, company_id, first_check_in, last_check_out,
+                worked_hours, punch_count, distance_min, distance_max, distance_avg,
+                create_uid, create_date, write_uid, write_date)
+            SELECT a.employee_id, %(local_day)s, a.attendance_location_id, e.company_id,
+                   MIN(a.check_in), MAX(a.check_out), SUM(COALESCE(a.worked_hours, 0)), COUNT(*),
+                   MIN(a.distance_from_office), MAX(a.distance_from_office), AVG(a.distance_from_office),
+                   %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+              FROM %(source)s a
+              JOIN hr_employee e ON e.id = a.employee_id
+              JOIN resource_resource r ON r.id = e.resource_id
+              %(restrict)s
+          GROUP BY a.employee_id, %(local_day)s, a.attendance_location_id, e.company_id
+            """,
+            local_day=local_day, restrict=restrict, source=source, uid=self.env.uid,
+        )
+
+    def _refresh(self, keys):
+        """Recompute the summary rows of the given ``(employee_id, date)`` pairs"""
+        keys = sorted(keys)
+        if not keys:
+            return
+        self.env.flush_all()
+        employee_ids, days = zip(*keys)
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM hr_attendance_daily_summary s
+             USING unnest(%s::int[], %s::date[]) AS k(employee_id, day)
+             WHERE s.employee_id = k.employee_id AND s.date = k.day
+            """,
+            list(employee_ids), list(days),
+        ))
+        self.env.cr.execute(self._aggregate_query(keys))
+        self.invalidate_model()
+
+    @api.model
+    def action_rebuild(self):
+        """Rebuild the whole summary table from the live and archived attendances"""
+        if not self.env['hr.attendance']._is_user_admin():
+            raise AccessError(_('Only attendance managers can rebuild the daily summary.'))
+        self.env.flush_all()
+        self.env.cr.execute(SQL("DELETE FROM hr_attendance_daily_summary"))
+        self.env.cr.execute(self._aggregate_query())
+        self.invalidate_model()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('The daily attendance summary has been rebuilt.'),
+                'type': 'success',
+                'next': {'type': 'ir.actions.client', 'tag': 'soft_reload'},
+            },
+        }
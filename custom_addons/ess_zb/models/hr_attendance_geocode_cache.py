@@ -0,0 +1,73 @@
+# models/hr_attendance_geocode_cache.py
+from odoo import models, fields, api
+from odoo.tools import SQL
+
+# coordinates are cached on a grid of 10^-GEOCODE_PRECISION degrees (~110 m)
+GEOCODE_PRECISION = 3
+
+
+class HrAttendanceGeocodeCache(models.Model):
+    _name = 'hr.attendance.geocode.cache'
+    _description = 'Reverse Geocoding Cache'
+    _log_access = False
+
+    provider = fields.Char(string='Provider', required=True)
+    lat_key = fields.Integer(string='Latitude Key', required=True)
+    lon_key = fields.Integer(string='Longitude Key', required=True)
+    place = fields.Char(string='Place')
+    last_used = fields.Datetime(string='Last Used', required=True, default=fields.Datetime.now, index=True)
+
+    _provider_point_uniq = models.UniqueIndex('(provider, lat_key, lon_key)')
+
+    @api.model
+    def _point_key(self, latitude, longitude):
+        scale = 10 ** GEOCODE_PRECISION
+        return round(latitude * scale), round(longitude * scale)
+
+    @api.model
+    def _lookup(self, provider, keys):
+        """Return ``{key: place}`` for the cached keys and refresh their last use"""
+        if not keys:
+            return {}
+        lat_keys, lon_keys = zip(*keys)
+        self.env.cr.execute(SQL(
+            """
+            UPDATE hr_attendance_geocode_cache c
+               SET last_used = NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%s::int[], %s::int[]) AS k(lat_key, lon_key)
+             WHERE c.provider = %s AND c.lat_key = k.lat_key AND c.lon_key = k.lon_key
+         RETURNING c.lat_key, c.lon_key, c.place
+            """,
+            list(lat_keys), list(lon_keys), provider,
+        ))
+        return {(lat_key, lon_key): place for lat_key, lon_key, place in self.env.cr.fetchall()}
+
+    @api.model
+    def _store(self, provider, places):
+        """Insert ``{key: place}`` resolved by ``provider``"""
+        if not places:
+            return
+        keys = list(places)
+        self.env.cr.execute(SQL(
+            """
+            INSERT INTO hr_attendance_geocode_cache (provider, lat_key, lon_key, place, last_used)
+            SELECT %s, k.lat_key, k.lon_key, k.place, NOW() AT TIME ZONE 'UTC'
+              FROM unnest(%s::int[], %s::int[], %s::varchar[]) AS k(lat_key, lon_key, place)
+                ON CONFLICT DO NOTHING
+            """,
+            provider,
+            [key[0] for key in keys], [key[1] for key in keys], [places[key] or None for key in keys],
+        ))
+
+    @api.model
+    def _evict(self, max_size):
+        """Drop the least recently used entries beyond ``max_size``"""
+        self.env.cr.execute(SQL(
+            """
+            DELETE FROM hr_attendance_geocode_cache
+             WHERE id IN (SELECT id FROM hr_attendance_geocode_cache
+                           ORDER BY last_used DESC OFFSET %s)
+            """,
+            max_size,
+        ))
+        self.invalidate_model()
@@ -1,16 +1,45 @@
 # models/hr_attendance_location.py
 from odoo import models, fields, api, _
 from odoo.exceptions import ValidationError
+from odoo.tools import SQL, ormcache
+
+from ..tools.geo import GeofenceIndex, Polygon
+
+# columns written by the bulk import, with their SQL array element type
+LOCATION_IMPORT_COLUMNS = {
+    'code': 'varchar',
+    'name': 'varchar',
+    'latitude': 'float8',
+    'longitude': 'float8',
+    'radius_km': 'float8',
+    'geofence_type': 'varchar',
+    'polygon_geojson': 'text',
+    'address': 'text',
+}
 
 class HrAttendanceLocation(models.Model):
     _name = 'hr.attendance.location'
     _description = 'Allowed Attendance Locations'
 
     name = fields.Char(string='Location Name', required=True)
+    code = fields.Char(string='Code', copy=False, help='External key of the location, used by the bulk import.')
     latitude = fields.Float(string='Latitude', required=True, digits=(10, 7))
     longitude = fields.Float(string='Longitude', required=True, digits=(10, 7))
     radius_km = fields.Float(string='Allowed Radius (km)', required=True, default=0.5)
+    geofence_type = fields.Selection([
+        ('circle', 'Circle'),
+        ('polygon', 'Polygon'),
+    ], string='Geofence Type', required=True, default='circle')
+    polygon_geojson = fields.Text(string='Polygon (GeoJSON)', help='GeoJSON Polygon geometry or Feature, in [longitude, latitude] order.')
+    bbox_min_latitude = fields.Float(string='Min Latitude', digits=(10, 7), compute='_compute_bbox', store=True)
+    bbox_max_latitude = fields.Float(string='Max Latitude', digits=(10, 7), compute='_compute_bbox', store=True)
+    bbox_min_longitude = fields.Float(string='Min Longitude', digits=(10, 7), compute='_compute_bbox', store=True)
+    bbox_max_longitude = fields.Float(string='Max Longitude', digits=(10, 7), compute='_compute_bbox', store=True)
     address = fields.Text(string='Address')
+    auto_checkout_hours = fields.Float(
+        string='Auto Check-out After (hours)',
+        help='Open attendances checked in here are closed this many hours after the check-in. '
+             '0 leaves them to the automatic check-out of the company.')
     company_id = fields.Many2one('res.company', string='Company', default=lambda self: self.env.company)
     active = fields.Boolean(string='Active', default=True)
     
@@ -28,13 +57,209 @@ class HrAttendanceLocation(models.Model):
         store=True
     )
     
+    _company_code_uniq = models.UniqueIndex(
+        '(company_id, code) WHERE code IS NOT NULL', "The location code must be unique per company.")
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        locations = super().create(vals_list)
+        self.env.registry.clear_cache()
+        return locations
+    
+    def write(self, vals):
+        res = super().write(vals)
+        self.env.registry.clear_cache()
+        return res
+    
+    def unlink(self):
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+    
+    def _get_polygon(self):
+        """Return the parsed :class:`Polygon` of a polygon geofence, else None"""
+        self.ensure_one()
+        if self.geofence_type != 'polygon' or not self.polygon_geojson:
+            return None
+        try:
+            return Polygon.from_geojson(self.polygon_geojson)
+        except ValueError:
+            return None
+    
+    def _get_geofence_entries(self):
+        """Return the entries describing these locations in a :class:`GeofenceIndex`"""
+        return [
+            (location.id, location.latitude, location.longitude, location.radius_km, location._get_polygon())
+            for location in self
+        ]
+    
+    @api.depends('geofence_type', 'polygon_geojson', 'latitude', 'longitude', 'radius_km')
+    def _compute_bbox(self):
+        for record in self:
+            polygon = record._get_polygon()
+            if polygon:
+                record.bbox_min_latitude = polygon.min_lat
+                record.bbox_max_latitude = polygon.max_lat
+                record.bbox_min_longitude = polygon.min_lon
+                record.bbox_max_longitude = polygon.max_lon
+            else:
+                dlat, dlon = GeofenceIndex.circle_extent(record.latitude, record.radius_km)
+                record.bbox_min_latitude = max(record.latitude - dlat, -90)
+                record.bbox_max_latitude = min(record.latitude + dlat, 90)
+                record.bbox_min_longitude = max(record.longitude - dlon, -180)
+                record.bbox_max_longitude = min(record.longitude + dlon, 180)
+    
+    @api.onchange('polygon_geojson')
+    def _onchange_polygon_geojson(self):
+        polygon = self._get_polygon()
+        if polygon and not (self.latitude or self.longitude):
+            self.latitude, self.longitude = polygon.centroid
+    
     @api.depends('employee_ids')
     def _compute_employee_count(self):
+        # counted on the relation table, the assigned employees are never loaded
+        location_ids = tuple(record.id for record in self if isinstance(record.id, int))
+        counts = {}
+        if location_ids:
+            self.flush_model(['employee_ids'])
+            self.env.cr.execute(SQL(
+                """
+                SELECT location_id, COUNT(*)
+                  FROM hr_attendance_location_employee_rel
+                 WHERE location_id IN %s
+              GROUP BY location_id
+                """,
+                location_ids,
+            ))
+            counts = dict(self.env.cr.fetchall())
         for record in self:
-            record.employee_count = len(record.employee_ids)
+            if isinstance(record.id, int):
+                record.employee_count = counts.get(record.id, 0)
+            else:
+                record.employee_count = len(record.employee_ids)
     
     @api.constrains('radius_km')
     def _check_radius(self):
         for record in self:
             if record.radius_km <= 0:
                 raise ValidationError(_('Radius must be greater than 0.'))
+    
+    @api.constrains('auto_checkout_hours')
+    def _check_auto_checkout_hours(self):
+        for record in self:
+            if record.auto_checkout_hours < 0:
+                raise ValidationError(_('The auto check-out delay cannot be negative.'))
+    
+    @api.constrains('geofence_type', 'polygon_geojson')
+    def _check_polygon(self):
+        for record in self.filtered(lambda l: l.geofence_type == 'polygon'):
+            try:
+                Polygon.from_geojson(record.polygon_geojson)
+            except ValueError as e:
+                raise ValidationError(_('Invalid polygon for %s: %s') % (record.name, e))
+    
+    @api.model
+    @ormcache('company_id')
+    def _get_geofence_index(self, company_id):
+        """Spatial index over the active company-wide (unassigned) locations of a company"""
+        locations = self.sudo().search_fetch([
+            ('company_id', '=', company_id),
+            ('active', '=', True),
+            ('employee_ids', '=', False),
+        ], ['latitude', 'longitude', 'radius_km', 'geofence_type', 'polygon_geojson'])
+        return GeofenceIndex(locations._get_geofence_entries())
+    
+    def _bulk_assign_employees(self, employee_ids, mode='add', batch_size=10000):
+        """Assign (or, with ``mode='remove'``, unassign) employees to these locations
+        
+        The relation table is written directly in set-based batches, then the
+        caches and ``employee_count`` are refreshed once for the whole operation.
+        """
+        employee_ids = sorted(set(employee_ids))
+        if not self or not employee_ids:
+            return
+        self.check_access('write')
+        self.env.flush_all()
+        for start in range(0, len(employee_ids), batch_size):
+            batch = employee_ids[start:start + batch_size]
+            if mode == 'remove':
+                self.env.cr.execute(SQL(
+                    """
+                    DELETE FROM hr_attendance_location_employee_rel
+                     WHERE location_id = ANY(%s) AND employee_id = ANY(%s)
+                    """,
+                    self.ids, batch,
+                ))
+            else:
+                self.env.cr.execute(SQL(
+                    """
+                    INSERT INTO hr_attendance_location_employee_rel (location_id, employee_id)
+                    SELECT l.id, e.id
+                      FROM unnest(%s::int[]) AS l(id)
+                     CROSS JOIN unnest(%s::int[]) AS e(id)
+                        ON CONFLICT DO NOTHING
+                    """,
+                    self.ids, batch,
+                ))
+        self.invalidate_recordset(['employee_ids'])
+        self.env['hr.employee'].invalidate_model(['attendance_location_ids'])
+        self.modified(['employee_ids'])
+        self.flush_recordset(['employee_count'])
+        self.env.registry.clear_cache()
+    
+    @api.model
+    def _import_locations(self, rows, company_id, update_existing=True, batch_size=5000):
+        """Upsert validated locations of a company by their ``code``
+        
+        Each batch is written with a single ``INSERT ... ON CONFLICT``, the
+        bounding boxes of the written locations are computed set-based at the
+        batch flush and the geofence indexes are rebuilt once at the end.
+        
+        :param rows: list of dicts with the keys of ``LOCATION_IMPORT_COLUMNS``
+        :param update_existing: update the locations whose code exists, else skip them
+        :return: ``(created, updated)`` counts
+        """
+        self.check_access('create')
+        self.check_access('write')
+        self.env.flush_all()
+        on_conflict = SQL('DO NOTHING')
+        if update_existing:
+            on_conflict = SQL('DO UPDATE SET %s', SQL(', ').join(
+                SQL('%s = EXCLUDED.%s', SQL.identifier(name), SQL.identifier(name))
+                for name in [*LOCATION_IMPORT_COLUMNS, 'write_uid', 'write_date'] if name != 'code'
+            ))
+        bbox_fields = [self._fields[name] for name in (
+            'bbox_min_latitude', 'bbox_max_latitude', 'bbox_min_longitude', 'bbox_max_longitude')]
+        created = updated = 0
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            self.env.cr.execute(SQL(
+                """
+                INSERT INTO hr_attendance_location (
+                    %(columns)s, company_id, active, employee_count,
+                    create_uid, create_date, write_uid, write_date)
+                SELECT u.*, %(company_id)s, TRUE, 0,
+                       %(uid)s, NOW() AT TIME ZONE 'UTC', %(uid)s, NOW() AT TIME ZONE 'UTC'
+                  FROM unnest(%(arrays)s) AS u
+                    ON CONFLICT (company_id, code) WHERE code IS NOT NULL %(on_conflict)s
+             RETURNING id, xmax = 0
+                """,
+                columns=SQL(', ').join(SQL.identifier(name) for name in LOCATION_IMPORT_COLUMNS),
+                arrays=SQL(', ').join(
+                    SQL('%s::' + sql_type + '[]', [row[name] for row in batch])
+                    for name, sql_type in LOCATION_IMPORT_COLUMNS.items()
+                ),
+                company_id=company_id, uid=self.env.uid, on_conflict=on_conflict,
+            ))
+            results = self.env.cr.fetchall()
+            inserted = sum(1 for __, is_new in results if is_new)
+            created += inserted
+            updated += len(results) - inserted
+            locations = self.browse([location_id for location_id, __ in results])
+            locations.invalidate_recordset()
+            for field in bbox_fields:
+                self.env.add_to_compute(field, locations)
+            self.env.flush_all()
+            self.env.invalidate_all()
+        self.env.registry.clear_cache()
+        return created, updated
@@ -1,5 +1,8 @@
 # models/hr_employee.py
-from odoo import models, fields
+from odoo import models, fields, api
+from odoo.tools import ormcache
+
+from ..tools.geo import GeofenceIndex
 
 class HrEmployee(models.Model):
     _inherit = 'hr.employee'
@@ -11,3 +14,60 @@ class HrEmployee(models.Model):
         'location_id',
         string='Allowed Attendance Locations'
     )
+    current_attendance_id = fields.Many2one(
+        'hr.attendance',
+        string='Current Open Attendance',
+        compute='_compute_current_attendance_id',
+        store=True,
+        readonly=True,
+    )
+    
+    @api.depends('attendance_ids.check_out')
+    def _compute_current_attendance_id(self):
+        # served by the partial index on open attendances, history is never loaded
+        open_attendances = {
+            attendance.employee_id.id: attendance
+            for attendance in self.env['hr.attendance'].sudo().search_fetch([
+                ('employee_id', 'in', self.ids),
+                ('check_out', '=', False),
+            ], ['employee_id'])
+        }
+        for employee in self:
+            employee.current_attendance_id = open_attendances.get(employee.id, False)
+    
+    @api.model_create_multi
+    def create(self, vals_list):
+        employees = super().create(vals_list)
+        if any('attendance_location_ids' in vals for vals in vals_list):
+            # company-wide geofence indexes only hold unassigned locations
+            self.env.registry.clear_cache()
+        return employees
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'attendance_location_ids' in vals:
+            self.env.registry.clear_cache()
+        return res
+
+    def unlink(self):
+        # the location assignments go with the employee, by cascade
+        res = super().unlink()
+        self.env.registry.clear_cache()
+        return res
+    
+    @api.model
+    @ormcache('employee_id', 'company_id')
+    def _get_attendance_geofence_index(self, employee_id, company_id):
+        """Index over the effective allowed locations of an employee
+        
+        Employees without active assigned locations fall back to the
+        company-wide locations of ``company_id``. Invalidated by any write
+        to attendance locations or to their employee assignment.
+        """
+        locations = self.env['hr.attendance.location'].sudo().search_fetch(
+            [('employee_ids', 'in', employee_id)],
+            ['latitude', 'longitude', 'radius_km', 'geofence_type', 'polygon_geojson'],
+        )
+        if not locations:
+            return self.env['hr.attendance.location']._get_geofence_index(company_id)
+        return GeofenceIndex(locations._get_geofence_entries())
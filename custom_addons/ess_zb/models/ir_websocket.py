@@ -0,0 +1,14 @@
+# models/ir_websocket.py
+from odoo import models
+
+
+class IrWebsocket(models.AbstractModel):
+    _inherit = 'ir.websocket'
+
+    def _build_bus_channel_list(self, channels):
+        """Subscribe attendance managers to the presence events of their companies"""
+        channels = super()._build_bus_channel_list(channels)
+        if self.env.uid and self.env['hr.attendance']._is_user_admin():
+            channels = list(channels)
+            channels.extend((company, 'ess_zb_presence') for company in self.env.user.company_ids)
+        return channels
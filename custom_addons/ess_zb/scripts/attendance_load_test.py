@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+# scripts/attendance_load_test.py
+"""Shift-start load test of the attendance RPCs.
+
+Simulates ``--users`` employees checking in within ``--ramp-up`` seconds
+against a running Odoo server. Every simulated user authenticates with its
+own session, then calls ``get_employee_attendance_status``,
+``employee_check_in`` and ``get_employee_attendance_status`` again, the
+way the attendance dashboard does. Punch coordinates are spread around the
+office with gaussian jitter, and a share of them is taken outside the
+geofence. A report with throughput, latency percentiles and error rates is
+printed per RPC at the end.
+
+Only the standard library is used, so the script runs from any machine
+that can reach the server::
+
+    # once: create the load test users, employees and office
+    python3 attendance_load_test.py --url http://localhost:8069 --db prod_copy \\
+        --admin-login admin --admin-password admin --setup --users 2000
+
+    # the 9:00 AM burst, 64 concurrent clients
+    python3 attendance_load_test.py --url http://localhost:8069 --db prod_copy \\
+        --users 2000 --workers 64 --ramp-up 120 --check-out
+
+``--check-out`` closes the attendances after the run so that it can be
+repeated. ``--mode process`` spreads the clients over several processes
+when a single Python interpreter becomes the bottleneck.
+"""
+import argparse
+import concurrent.futures
+import http.cookiejar
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+import urllib.error
+import urllib.request
+
+# errors the server reports as business rejections rather than failures
+REJECTION_ERRORS = ('odoo.exceptions.UserError', 'odoo.exceptions.ValidationError')
+
+METERS_PER_DEGREE = 111320.0
+
+
+class RpcError(Exception):
+    """Error returned by the server in a JSON-RPC response"""
+
+    def __init__(self, name, message):
+        super().__init__(message)
+        self.name = name
+
+    @property
+    def rejected(self):
+        return self.name in REJECTION_ERRORS
+
+
+class Client:
+    """JSON-RPC client holding one web session"""
+
+    def __init__(self, url, db, timeout):
+        self.url = url.rstrip('/')
+        self.db = db
+        self.timeout = timeout
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+        self.request_ids = itertools.count(1)
+
+    def _post(self, path, params):
+        payload = json.dumps({
+            'jsonrpc': '2.0',
+            'method': 'call',
+            'id': next(self.request_ids),
+            'params': params,
+        }).encode()
+        request = urllib.request.Request(
+            self.url + path, data=payload, headers={'Content-Type': 'application/json'})
+        with self.opener.open(request, timeout=self.timeout) as response:
+            body = json.loads(response.read())
+        if body.get('error'):
+            data = body['error'].get('data') or {}
+            raise RpcError(data.get('name', 'unknown'), data.get('message') or body['error'].get('message'))
+        return body.get('result')
+
+    def authenticate(self, login, password):
+        return self._post('/web/session/authenticate', {'db': self.db, 'login': login, 'password': password})
+
+    def call_kw(self, model, method, args=(), kwargs=None):
+        return self._post('/web/dataset/call_kw/%s/%s' % (model, method), {
+            'model': model,
+            'method': method,
+            'args': list(args),
+            'kwargs': kwargs or {},
+        })
+
+
+def _login(options, index):
+    return options.login_pattern.format(index)
+
+
+def setup(options):
+    """Create the office location and the load test users and employees, if missing"""
+    client = Client(options.url, options.db, options.timeout)
+    client.authenticate(options.admin_login, options.admin_password)
+    locations = client.call_kw('hr.attendance.location', 'search_read', [
+        [('name', '=', options.location_name)], ['id'],
+    ])
+    if locations:
+        location_id = locations[0]['id']
+    else:
+        location_id = client.call_kw('hr.attendance.location', 'create', [{
+            'name': options.location_name,
+            'latitude': options.latitude,
+            'longitude': options.longitude,
+            'radius_km': options.radius_km,
+        }])
+    logins = [_login(options, index) for index in range(options.users)]
+    existing = {
+        user['login'] for user in client.call_kw('res.users', 'search_read', [
+            [('login', 'in', logins)], ['login'],
+        ], {'context': {'active_test': False}})
+    }
+    missing = [login for login in logins if login not in existing]
+    for start in range(0, len(missing), 200):
+        batch = missing[start:start + 200]
+        user_ids = client.call_kw('res.users', 'create', [[{
+            'name': 'Load Test %s' % login,
+            'login': login,
+            'password': options.password,
+        } for login in batch]], {'context': {'no_reset_password': True}})
+        client.call_kw('hr.employee', 'create', [[{
+            'name': 'Load Test %s' % login,
+            'user_id': user_id,
+            'attendance_location_ids': [(6, 0, [location_id])],
+        } for login, user_id in zip(batch, user_ids)]])
+    print('location %s, %s users created, %s already present' % (location_id, len(missing), len(existing)))
+
+
+def _punch_point(options, rng):
+    """Coordinates around the office, outside of the geofence for a share of the punches"""
+    if rng.random() < options.outside_ratio:
+        distance = options.radius_km * 1000 * rng.uniform(1.5, 5.0)
+    else:
+        distance = abs(rng.gauss(0, options.jitter_m))
+    bearing = rng.uniform(0, 2 * math.pi)
+    latitude = options.latitude + distance * math.cos(bearing) / METERS_PER_DEGREE
+    longitude = options.longitude + distance * math.sin(bearing) / (
+        METERS_PER_DEGREE * math.cos(math.radians(options.latitude)))
+    return latitude, longitude
+
+
+def _timed(samples, name, call):
+    """Run ``call`` and record ``(name, seconds, outcome)``; outcome is ok, rejected or error"""
+    start = time.perf_counter()
+    try:
+        result = call()
+    except RpcError as e:
+        samples.append((name, time.perf_counter() - start, 'rejected' if e.rejected else 'error'))
+        return None
+    except (urllib.error.URLError, OSError, ValueError):
+        samples.append((name, time.perf_counter() - start, 'error'))
+        return None
+    samples.append((name, time.perf_counter() - start, 'ok'))
+    return result
+
+
+def simulate_user(options, index, start_at):
+    """One employee arriving at work; return the list of samples"""
+    rng = random.Random(options.seed * 1000003 + index)
+    delay = start_at - time.monotonic()
+    if delay > 0:
+        time.sleep(delay)
+    samples = []
+    client = Client(options.url, options.db, options.timeout)
+    if _timed(samples, 'login', lambda: client.authenticate(_login(options, index), options.password)) is None:
+        return samples
+    latitude, longitude = _punch_point(options, rng)
+    model = 'hr.attendance'
+    _timed(samples, 'get_employee_attendance_status', lambda: client.call_kw(model, 'get_employee_attendance_status'))
+    _timed(samples, 'employee_check_in', lambda: client.call_kw(model, 'employee_check_in', [latitude, longitude]))
+    _timed(samples, 'get_employee_attendance_status', lambda: client.call_kw(model, 'get_employee_attendance_status'))
+    if options.check_out:
+        # not part of the burst, recorded apart
+        _timed(samples, 'employee_check_out', lambda: client.call_kw(model, 'employee_check_out', [latitude, longitude]))
+    return samples
+
+
+def _start_times(options, indexes, origin):
+    """Arrival times spread over the ramp-up, denser in its middle like a shift start"""
+    rng = random.Random(options.seed)
+    ramp = options.ramp_up
+    return {
+        index: origin + (min(max(rng.triangular(0, ramp), 0), ramp) if ramp else 0)
+        for index in indexes
+    }
+
+
+def run_threads(options, indexes, origin):
+    start_times = _start_times(options, indexes, origin)
+    samples = []
+    with concurrent.futures.ThreadPoolExecutor(max_workers=options.workers) as executor:
+        futures = [
+            executor.submit(simulate_user, options, index, start_times[index])
+            for index in sorted(indexes, key=start_times.get)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            samples += future.result()
+    return samples
+
+
+def _run_slice(options, indexes, origin):
+    # time.monotonic() is system wide on Linux, so the origin is shared with the parent
+    return run_threads(options, indexes, origin)
+
+
+def run_processes(options, indexes, origin):
+    processes = options.processes or os.cpu_count() or 1
+    slices = [indexes[position::processes] for position in range(processes)]
+    per_process = argparse.Namespace(**vars(options))
+    per_process.workers = max(options.workers // processes, 1)
+    samples = []
+    with concurrent.futures.ProcessPoolExecutor(max_workers=processes) as executor:
+        for result in executor.map(_run_slice, [per_process] * processes, slices, [origin] * processes):
+            samples += result
+    return samples
+
+
+def _percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(int(math.ceil(pct / 100 * len(ordered))) - 1, len(ordered) - 1)]
+
+
+def report(samples, elapsed):
+    """Aggregate the samples per RPC"""
+    result = {'elapsed_s': round(elapsed, 3), 'calls': {}}
+    for name in sorted({sample[0] for sample in samples}):
+        latencies = sorted(sample[1] for sample in samples if sample[0] == name)
+        outcomes = [sample[2] for sample in samples if sample[0] == name]
+        count = len(latencies)
+        result['calls'][name] = {
+            'count': count,
+            'throughput_per_s': round(count / elapsed, 2) if elapsed else 0.0,
+            'rejected_pct': round(100.0 * outcomes.count('rejected') / count, 2),
+            'error_pct': round(100.0 * outcomes.count('error') / count, 2),
+            'p50_ms': round(_percentile(latencies, 50) * 1000, 1),
+            'p90_ms': round(_percentile(latencies, 90) * 1000, 1),
+            'p95_ms': round(_percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(_percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(latencies[-1] * 1000, 1),
+        }
+    return result
+
+
+def print_report(result):
+    columns = ('count', 'throughput_per_s', 'rejected_pct', 'error_pct',
+               'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms')
+    headers = ('calls', 'per s', 'rejected %', 'error %', 'p50 ms', 'p90 ms', 'p95 ms', 'p99 ms', 'max ms')
+    width = max([len(name) for name in result['calls']] + [4])
+    print('%-*s %s' % (width, 'rpc', ' '.join('%10s' % header for header in headers)))
+    for name, stats in result['calls'].items():
+        print('%-*s %s' % (width, name, ' '.join('%10s' % stats[column] for column in columns)))
+    print('elapsed: %.1f s' % result['elapsed_s'])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--url', default='http://localhost:8069')
+    parser.add_argument('--db', required=True)
+    parser.add_argument('--users', type=int, default=100, help='number of simulated employees')
+    parser.add_argument('--login-pattern', default='ess_zb_load_{}', help='login of the n-th user')
+    parser.add_argument('--password', default='ess_zb_load', help='password of the simulated users')
+    parser.add_argument('--mode', choices=('thread', 'process'), default='thread')
+    parser.add_argument('--workers', type=int, default=32, help='concurrent clients, in total')
+    parser.add_argument('--processes', type=int, help='processes in process mode, default: CPU count')
+    parser.add_argument('--ramp-up', type=float, default=60.0, help='seconds over which the users arrive')
+    parser.add_argument('--latitude', type=float, default=12.9716, help='office latitude')
+    parser.add_argument('--longitude', type=float, default=77.5946, help='office longitude')
+    parser.add_argument('--radius-km', type=float, default=0.2, help='office geofence radius (setup)')
+    parser.add_argument('--jitter-m', type=float, default=40.0, help='standard deviation of the GPS jitter')
+    parser.add_argument('--outside-ratio', type=float, default=0.02, help='share of punches outside the geofence')
+    parser.add_argument('--check-out', action='store_true', help='check out after the check-in')
+    parser.add_argument('--timeout', type=float, default=60.0, help='HTTP timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--setup', action='store_true', help='create the users, employees and office, then exit')
+    parser.add_argument('--admin-login', default='admin')
+    parser.add_argument('--admin-password', default='admin')
+    parser.add_argument('--location-name', default='Load Test Office')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    if options.setup:
+        setup(options)
+        return 0
+    indexes = list(range(options.users))
+    origin = time.monotonic()
+    run = run_processes if options.mode == 'process' else run_threads
+    samples = run(options, indexes, origin)
+    result = report(samples, time.monotonic() - origin)
+    if options.json:
+        print(json.dumps(result, indent=2, sort_keys=True))
+    else:
+        print_report(result)
+    errors = sum(1 for sample in samples if sample[2] == 'error')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,8 +1,15 @@
 /** @odoo-module **/
 
-import { Component, useState, onMounted } from "@odoo/owl";
+import { Component, useState, onMounted, onWillUnmount } from "@odoo/owl";
 import { registry } from "@web/core/registry";
 import { useService } from "@web/core/utils/hooks";
+import { ConnectionLostError } from "@web/core/network/rpc";
+import { serializeDateTime } from "@web/core/l10n/dates";
+import { PunchQueue, newClientUuid } from "@ess_zb/js/punch_queue";
+
+const { DateTime } = luxon;
+// a fix from the background watch younger than this is punched right away
+const FIX_MAX_AGE_MS = 30000;
 
 class AttendanceDashboard extends Component {
   setup() {
@@ -13,13 +20,90 @@ class AttendanceDashboard extends Component {
       isCheckedIn: false,
       checkInTime: "",
       loading: false,
+      pendingPunches: 0,
+      gpsAccuracy: null,
     });
+    this.employeeId = false;
+    this.maxAccuracy = 0;
+    this.fix = null;
+    this.watchId = null;
+    this.queue = new PunchQueue();
+    this.flushing = false;
+    this.onOnline = () => this.flushQueue();
 
-    onMounted(() => {
-      this.loadAttendanceStatus();
+    onMounted(async () => {
+      window.addEventListener("online", this.onOnline);
+      this.startWatch();
+      await this.loadAttendanceStatus();
+      await this.flushQueue();
+    });
+    onWillUnmount(() => {
+      window.removeEventListener("online", this.onOnline);
+      if (this.watchId !== null) {
+        navigator.geolocation.clearWatch(this.watchId);
+      }
     });
   }
 
+  async queuePunch(type, location, clientUuid, timestamp) {
+    await this.queue.add({
+      client_uuid: clientUuid,
+      employee_id: this.employeeId,
+      type,
+      timestamp,
+      latitude: location.latitude,
+      longitude: location.longitude,
+      accuracy: location.accuracy,
+    });
+    this.state.pendingPunches = (await this.queue.all()).length;
+    this.state.isCheckedIn = type === "check_in";
+    this.notification.add(
+      "You are offline. Your punch was saved and will be sent when the connection is back.",
+      { type: "warning" }
+    );
+  }
+
+  async flushQueue() {
+    if (this.flushing) {
+      return;
+    }
+    this.flushing = true;
+    try {
+      const punches = await this.queue.all();
+      this.state.pendingPunches = punches.length;
+      if (!punches.length) {
+        return;
+      }
+      const results = await this.orm.call("hr.attendance", "ingest_punches", [punches]);
+      await this.queue.remove(punches.map((punch) => punch.client_uuid));
+      for (const result of results) {
+        if (result.status === "error") {
+          this.notification.add(`Offline punch rejected: ${result.message}`, {
+            type: "danger",
+            sticky: true,
+          });
+        }
+      }
+      this.state.pendingPunches = 0;
+      await this.loadAttendanceStatus();
+    } catch (error) {
+      // still offline, punches stay queued until the next "online" event
+      if (!(error instanceof ConnectionLostError)) {
+        throw error;
+      }
+    } finally {
+      this.flushing = false;
+    }
+  }
+
+  applyStatus(status) {
+    this.employeeId = status.employee_id;
+    this.state.employeeName = status.employee_name;
+    this.state.isCheckedIn = status.is_checked_in;
+    this.state.checkInTime = status.check_in_time;
+    this.maxAccuracy = status.max_gps_accuracy_m;
+  }
+
   async loadAttendanceStatus() {
     try {
       const result = await this.orm.call(
@@ -32,9 +116,7 @@ class AttendanceDashboard extends Component {
         return;
       }
 
-      this.state.employeeName = result.employee_name;
-      this.state.isCheckedIn = result.is_checked_in;
-      this.state.checkInTime = result.check_in_time;
+      this.applyStatus(result);
     } catch (error) {
       console.error("Error loading attendance:", error);
       this.notification.add("Failed to load attendance status", {
@@ -43,7 +125,48 @@ class AttendanceDashboard extends Component {
     }
   }
 
+  startWatch() {
+    // warm up the GPS as soon as the dashboard opens so that punches do not wait for a fix
+    if (!navigator.geolocation) {
+      return;
+    }
+    this.watchId = navigator.geolocation.watchPosition(
+      (position) => this.storeFix(position),
+      // errors are reported when a punch actually needs the location
+      () => {},
+      {
+        enableHighAccuracy: true,
+        maximumAge: FIX_MAX_AGE_MS,
+      }
+    );
+  }
+
+  storeFix(position) {
+    if (this.fix && position.timestamp < this.fix.timestamp) {
+      return this.fix;
+    }
+    this.fix = {
+      latitude: position.coords.latitude,
+      longitude: position.coords.longitude,
+      accuracy: position.coords.accuracy,
+      timestamp: position.timestamp,
+    };
+    this.state.gpsAccuracy = Math.round(position.coords.accuracy);
+    return this.fix;
+  }
+
+  isFixUsable(fix) {
+    return (
+      fix &&
+      Date.now() - fix.timestamp <= FIX_MAX_AGE_MS &&
+      (!this.maxAccuracy || fix.accuracy <= this.maxAccuracy)
+    );
+  }
+
   async getLocation() {
+    if (this.isFixUsable(this.fix)) {
+      return this.fix;
+    }
     return new Promise((resolve, reject) => {
       if (!navigator.geolocation) {
         reject(new Error("Geolocation is not supported by your browser"));
@@ -51,12 +174,7 @@ class AttendanceDashboard extends Component {
       }
 
       navigator.geolocation.getCurrentPosition(
-        (position) => {
-          resolve({
-            latitude: position.coords.latitude,
-            longitude: position.coords.longitude,
-          });
-        },
+        (position) => resolve(this.storeFix(position)),
         (error) => {
           let errorMsg = "Unable to get location. ";
           switch (error.code) {
@@ -77,7 +195,7 @@ class AttendanceDashboard extends Component {
         {
           enableHighAccuracy: true,
           timeout: 10000,
-          maximumAge: 0,
+          maximumAge: FIX_MAX_AGE_MS,
         }
       );
     });
@@ -85,20 +203,29 @@ class AttendanceDashboard extends Component {
 
   async checkIn() {
     this.state.loading = true;
+    const clientUuid = newClientUuid();
+    let location, timestamp;
     try {
-      const location = await this.getLocation();
-      const result = await this.orm.call(
+      location = await this.getLocation();
+      timestamp = serializeDateTime(DateTime.now());
+      const { status } = await this.orm.call(
         "hr.attendance",
-        "employee_check_in",
-        [],
+        "employee_punch",
+        ["check_in"],
         {
           latitude: location.latitude,
           longitude: location.longitude,
+          accuracy: location.accuracy,
+          client_uuid: clientUuid,
         }
       );
       this.notification.add("Checked in successfully!", { type: "success" });
-      await this.loadAttendanceStatus();
+      this.applyStatus(status);
     } catch (error) {
+      if (error instanceof ConnectionLostError && location) {
+        await this.queuePunch("check_in", location, clientUuid, timestamp);
+        return;
+      }
       console.error("Check-in error:", error);
       // Extract actual error message from RPC error
       let errorMessage = "Check-in failed";
@@ -118,20 +245,29 @@ class AttendanceDashboard extends Component {
 
   async checkOut() {
     this.state.loading = true;
+    const clientUuid = newClientUuid();
+    let location, timestamp;
     try {
-      const location = await this.getLocation();
-      const result = await this.orm.call(
+      location = await this.getLocation();
+      timestamp = serializeDateTime(DateTime.now());
+      const { status } = await this.orm.call(
         "hr.attendance",
-        "employee_check_out",
-        [],
+        "employee_punch",
+        ["check_out"],
         {
           latitude: location.latitude,
           longitude: location.longitude,
+          accuracy: location.accuracy,
+          client_uuid: clientUuid,
         }
       );
       this.notification.add("Checked out successfully!", { type: "success" });
-      await this.loadAttendanceStatus();
+      this.applyStatus(status);
     } catch (error) {
+      if (error instanceof ConnectionLostError && location) {
+        await this.queuePunch("check_out", location, clientUuid, timestamp);
+        return;
+      }
       console.error("Check-out error:", error);
       let errorMessage = "Check-out failed";
       if (error.data && error.data.message) {
@@ -0,0 +1,104 @@
+/** @odoo-module **/
+
+import { Component, useState, useRef, onWillStart } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+
+const { DateTime } = luxon;
+const CANVAS_SIZE = 600;
+
+class AttendanceHeatmap extends Component {
+  setup() {
+    this.orm = useService("orm");
+    this.notification = useService("notification");
+    this.canvasRef = useRef("canvas");
+    const today = DateTime.now();
+    this.state = useState({
+      locations: [],
+      locationId: false,
+      dateFrom: today.minus({ months: 1 }).toISODate(),
+      dateTo: today.toISODate(),
+      cellM: 25,
+      summary: null,
+      loading: false,
+    });
+
+    onWillStart(async () => {
+      this.state.locations = await this.orm.searchRead(
+        "hr.attendance.location",
+        [],
+        ["name"],
+        { order: "name" }
+      );
+      if (this.state.locations.length) {
+        this.state.locationId = this.state.locations[0].id;
+      }
+    });
+  }
+
+  onLocationChange(ev) {
+    this.state.locationId = parseInt(ev.target.value);
+  }
+
+  async loadHeatmap() {
+    if (!this.state.locationId) {
+      return;
+    }
+    this.state.loading = true;
+    try {
+      const dateTo = DateTime.fromISO(this.state.dateTo).plus({ days: 1 }).toISODate();
+      const data = await this.orm.call("hr.attendance", "get_check_in_heatmap", [
+        this.state.locationId,
+        `${this.state.dateFrom} 00:00:00`,
+        `${dateTo} 00:00:00`,
+        parseFloat(this.state.cellM) || 25,
+      ]);
+      this.state.summary = {
+        total: data.total,
+        max: data.max,
+        cellM: data.cell_m,
+        name: data.location.name,
+      };
+      this.draw(data);
+    } catch (error) {
+      console.error("Heatmap error:", error);
+      this.notification.add("Failed to load the check-in heatmap", {
+        type: "danger",
+      });
+    } finally {
+      this.state.loading = false;
+    }
+  }
+
+  draw(data) {
+    const canvas = this.canvasRef.el;
+    const scale = Math.max(1, Math.floor(CANVAS_SIZE / Math.max(data.rows, data.cols)));
+    canvas.width = data.cols * scale;
+    canvas.height = data.rows * scale;
+    const context = canvas.getContext("2d");
+    context.fillStyle = "#f8fafc";
+    context.fillRect(0, 0, canvas.width, canvas.height);
+
+    // cells are [row, col, count] triples, row 0 being the southern edge
+    for (let index = 0; index < data.cells.length; index += 3) {
+      const [row, col, count] = data.cells.slice(index, index + 3);
+      const intensity = Math.sqrt(count / data.max);
+      context.fillStyle = `rgba(220, 38, 38, ${0.15 + 0.85 * intensity})`;
+      context.fillRect(col * scale, (data.rows - 1 - row) * scale, scale, scale);
+    }
+
+    // allowed radius around the location reference point
+    const x = ((data.location.longitude - data.origin[1]) / data.cell[1]) * scale;
+    const y = (data.rows - (data.location.latitude - data.origin[0]) / data.cell[0]) * scale;
+    const radius = ((data.location.radius_km * 1000) / data.cell_m) * scale;
+    context.strokeStyle = "#2563eb";
+    context.lineWidth = 2;
+    context.beginPath();
+    context.arc(x, y, radius, 0, 2 * Math.PI);
+    context.stroke();
+  }
+}
+
+AttendanceHeatmap.template = "ess_zb.AttendanceHeatmap";
+
+registry.category("actions").add("attendance_heatmap", AttendanceHeatmap);
@@ -0,0 +1,88 @@
+/** @odoo-module **/
+
+import { Component, useState, onWillStart, onWillUnmount } from "@odoo/owl";
+import { registry } from "@web/core/registry";
+import { useService } from "@web/core/utils/hooks";
+
+const { DateTime } = luxon;
+
+class PresenceBoard extends Component {
+  setup() {
+    this.orm = useService("orm");
+    this.busService = useService("bus_service");
+    this.state = useState({
+      locations: [],
+      loading: false,
+    });
+    this.companyIds = [];
+    this.onPresence = (payload) => this.applyEvents(payload);
+
+    onWillStart(async () => {
+      await this.load();
+      this.busService.subscribe("ess_zb_presence", this.onPresence);
+      this.busService.start();
+    });
+    onWillUnmount(() => {
+      this.busService.unsubscribe("ess_zb_presence", this.onPresence);
+    });
+  }
+
+  async load() {
+    this.state.loading = true;
+    try {
+      const board = await this.orm.call("hr.attendance", "get_presence_board", []);
+      this.companyIds = board.company_ids;
+      this.state.locations = board.locations;
+    } finally {
+      this.state.loading = false;
+    }
+  }
+
+  get total() {
+    return this.state.locations.reduce((total, location) => total + location.people.length, 0);
+  }
+
+  removeAttendance(attendanceId, employeeId) {
+    for (const location of this.state.locations) {
+      const index = location.people.findIndex(
+        (person) => person.attendance_id === attendanceId || person.employee_id === employeeId
+      );
+      if (index !== -1) {
+        location.people.splice(index, 1);
+      }
+    }
+  }
+
+  applyEvents(payload) {
+    if (!this.companyIds.includes(payload.company_id)) {
+      return;
+    }
+    for (const event of payload.events) {
+      if (event.event === "check_out") {
+        this.removeAttendance(event.attendance_id, false);
+        continue;
+      }
+      const location = this.state.locations.find((location) => location.id === event.location_id);
+      if (!location) {
+        // a location the board does not know yet: resynchronize
+        this.load();
+        return;
+      }
+      this.removeAttendance(event.attendance_id, event.employee_id);
+      location.people.push({
+        attendance_id: event.attendance_id,
+        employee_id: event.employee_id,
+        employee_name: event.employee_name,
+        check_in: event.check_in,
+      });
+    }
+  }
+
+  formatTime(value) {
+    return DateTime.fromSQL(value, { zone: "utc" }).toLocal().toFormat("HH:mm");
+  }
+}
+
+PresenceBoard.template = "ess_zb.PresenceBoard";
+
+registry.category("actions").add("attendance_presence_board", PresenceBoard);
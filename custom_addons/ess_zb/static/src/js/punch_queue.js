@@ -0,0 +1,67 @@
+/** @odoo-module **/
+
+const DB_NAME = "ess_zb_attendance";
+const STORE_NAME = "punches";
+
+/**
+ * Persistent queue of punches captured while the server was unreachable.
+ * Punches are stored in IndexedDB so they survive reloads and are replayed
+ * through `hr.attendance.ingest_punches`, which ignores client keys it has
+ * already recorded.
+ */
+export class PunchQueue {
+  constructor() {
+    this._db = null;
+  }
+
+  async _open() {
+    if (!this._db) {
+      this._db = await new Promise((resolve, reject) => {
+        const request = indexedDB.open(DB_NAME, 1);
+        request.onupgradeneeded = () => {
+          request.result.createObjectStore(STORE_NAME, { keyPath: "client_uuid" });
+        };
+        request.onsuccess = () => resolve(request.result);
+        request.onerror = () => reject(request.error);
+      });
+    }
+    return this._db;
+  }
+
+  async _run(mode, callback) {
+    const db = await this._open();
+    return new Promise((resolve, reject) => {
+      const transaction = db.transaction(STORE_NAME, mode);
+      const request = callback(transaction.objectStore(STORE_NAME));
+      transaction.oncomplete = () => resolve(request && request.result);
+      transaction.onerror = () => reject(transaction.error);
+    });
+  }
+
+  add(punch) {
+    return this._run("readwrite", (store) => store.put(punch));
+  }
+
+  async all() {
+    const punches = (await this._run("readonly", (store) => store.getAll())) || [];
+    return punches.sort((a, b) => a.timestamp.localeCompare(b.timestamp));
+  }
+
+  remove(clientUuids) {
+    return this._run("readwrite", (store) => {
+      for (const clientUuid of clientUuids) {
+        store.delete(clientUuid);
+      }
+    });
+  }
+}
+
+export function newClientUuid() {
+  if (window.crypto && window.crypto.randomUUID) {
+    return window.crypto.randomUUID();
+  }
+  return "xxxxxxxx-xxxx-4xxx-yxxx-xxxxxxxxxxxx".replace(/[xy]/g, (c) => {
+    const r = (Math.random() * 16) | 0;
+    return (c === "x" ? r : (r & 0x3) | 0x8).toString(16);
+  });
+}
@@ -0,0 +1,13 @@
+# tests/__init__.py
+from . import test_check_in_benchmark
+from . import test_concurrent_check_in
+from . import test_geofence_cache
+from . import test_ingest_punches
+from . import test_geo
+from . import test_search_punches_near
+from . import test_auto_check_out
+from . import test_validate_geofence_batch
+from . import test_location_import
+from . import test_import_attendance_history
+from . import test_archive_attendances
+from . import test_presence_events
@@ -0,0 +1,106 @@
+# tests/test_archive_attendances.py
+from datetime import datetime, time, timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+LATITUDE = 12.9716
+LONGITUDE = 77.5946
+
+
+@tagged('post_install', '-at_install')
+class TestArchiveAttendances(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env['ir.config_parameter'].sudo().set_param('ess_zb.archive_horizon_days', 365)
+        cls.location = cls.env['hr.attendance.location'].create({
+            'name': 'Archive Site',
+            'latitude': LATITUDE,
+            'longitude': LONGITUDE,
+            'radius_km': 0.5,
+        })
+        cls.employee, cls.single_employee = cls.env['hr.employee'].create([
+            {'name': 'Archive Employee'},
+            {'name': 'Single Archive Employee'},
+        ])
+        cls.first_day = fields.Date.today() - timedelta(days=400)
+        cls.old_attendances = cls.env['hr.attendance'].create([
+            cls._attendance_vals(cls.employee, cls.first_day + timedelta(days=offset))
+            for offset in range(3)
+        ])
+        cls.single_attendance = cls.env['hr.attendance'].create(
+            cls._attendance_vals(cls.single_employee, cls.first_day))
+        cls.recent_attendance = cls.env['hr.attendance'].create(
+            cls._attendance_vals(cls.single_employee, fields.Date.today() - timedelta(days=10)))
+        cls.anomaly = cls.env['hr.attendance.anomaly'].create({
+            'attendance_id': cls.old_attendances[0].id,
+            'original_attendance_id': cls.old_attendances[0].id,
+            'employee_id': cls.employee.id,
+            'date': cls.first_day,
+            'anomaly_type': 'check_out_outside',
+        })
+
+    @classmethod
+    def _attendance_vals(cls, employee, day):
+        return {
+            'employee_id': employee.id,
+            'check_in': datetime.combine(day, time(9)),
+            'check_out': datetime.combine(day, time(17)),
+            'check_in_latitude': LATITUDE,
+            'check_in_longitude': LONGITUDE,
+            'attendance_location_id': cls.location.id,
+        }
+
+    def _archive(self):
+        self.env['hr.attendance.archive']._cron_archive_attendances()
+
+    def test_last_attendance_stays_live(self):
+        moved_ids = self.old_attendances[:2].ids
+        kept = self.old_attendances[2]
+        self.assertEqual(self.employee.last_attendance_id, kept)
+        self._archive()
+
+        self.assertFalse(self.env['hr.attendance'].browse(moved_ids).exists())
+        self.assertTrue(kept.exists())
+        self.assertEqual(self.employee.last_attendance_id, kept)
+        archived = self.env['hr.attendance.archive'].search([('employee_id', '=', self.employee.id)])
+        self.assertEqual(sorted(archived.mapped('original_id')), moved_ids)
+        self.assertTrue(all(archived.mapped('archived_on')))
+        self.assertEqual(archived.mapped('worked_hours'), [8.0, 8.0])
+        self.assertEqual(archived.attendance_location_id, self.location)
+
+        # the old attendance of the other employee is moved, the recent one is
+        # too young to be archived and stays the last attendance
+        self.assertFalse(self.single_attendance.exists())
+        self.assertTrue(self.recent_attendance.exists())
+
+    def test_anomaly_link_cleared(self):
+        self._archive()
+        self.assertFalse(self.anomaly.attendance_id)
+        self.assertEqual(self.anomaly.original_attendance_id, self.old_attendances[0].id)
+
+    def test_report_shows_moved_rows(self):
+        report = self.env['hr.attendance.report.all']
+        domain = [('employee_id', '=', self.employee.id)]
+        self.assertEqual(report.search_count(domain + [('is_archived', '=', True)]), 0)
+        self._archive()
+
+        rows = report.search(domain, order='check_in')
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows.mapped('is_archived'), [True, True, False])
+        self.assertEqual(rows.mapped('check_in'), self.old_attendances.mapped('check_in'))
+
+    def test_export_and_heatmap_read_archive(self):
+        self._archive()
+        date_from = datetime.combine(self.first_day, time.min)
+        date_to = date_from + timedelta(days=3)
+
+        rows = self.env['hr.attendance']._iter_export_rows(date_from, date_to, batch_size=1)
+        exported = sorted(row[2] for row in rows if row[1] == self.employee.name)
+        self.assertEqual(exported, self.old_attendances.mapped('check_in'))
+
+        heatmap = self.env['hr.attendance'].get_check_in_heatmap(self.location.id, date_from, date_to)
+        self.assertEqual(heatmap['total'], 4)
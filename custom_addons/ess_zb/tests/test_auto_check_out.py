@@ -0,0 +1,64 @@
+# tests/test_auto_check_out.py
+from datetime import datetime, time, timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestAutoCheckOut(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.env.company.write({'auto_check_out': True, 'auto_check_out_tolerance': 1.0})
+        location_vals = {'latitude': 12.9716, 'longitude': 77.5946, 'radius_km': 0.5}
+        cls.delayed_location = cls.env['hr.attendance.location'].create(
+            dict(location_vals, name='Delayed Site', auto_checkout_hours=12))
+        cls.plain_location = cls.env['hr.attendance.location'].create(dict(location_vals, name='Plain Site'))
+        cls.archived_location = cls.env['hr.attendance.location'].create(
+            dict(location_vals, name='Archived Delayed Site', auto_checkout_hours=12, active=False))
+        cls.employee_delayed, cls.employee_plain, cls.employee_open = cls.env['hr.employee'].create([{
+            'name': name,
+            'tz': 'UTC',
+        } for name in ('Delayed Employee', 'Plain Employee', 'Open Employee')])
+        today = fields.Date.today()
+        cls.day = today - timedelta(days=today.weekday() + 7)
+
+    def _at(self, hour):
+        return datetime.combine(self.day, time(hour))
+
+    def _worked_day(self, employee, location):
+        """A closed morning attendance at ``location``, then an afternoon one left open"""
+        self.env['hr.attendance'].create({
+            'employee_id': employee.id,
+            'check_in': self._at(6),
+            'check_out': self._at(10),
+            'attendance_location_id': location.id,
+        })
+        return self.env['hr.attendance'].create({'employee_id': employee.id, 'check_in': self._at(11)})
+
+    def test_core_cron_counts_delayed_location_attendances(self):
+        delayed = self._worked_day(self.employee_delayed, self.delayed_location)
+        plain = self._worked_day(self.employee_plain, self.plain_location)
+        self.env['hr.attendance']._cron_auto_check_out()
+
+        self.assertTrue(delayed.check_out)
+        self.assertEqual(delayed.out_mode, 'auto_check_out')
+        # the morning at the delayed location counts as for any other location
+        self.assertEqual(delayed.check_out - delayed.check_in, plain.check_out - plain.check_in)
+        self.assertEqual(self.employee_delayed.total_overtime, self.employee_plain.total_overtime)
+
+    def test_core_cron_skips_open_delayed_location_attendances(self):
+        attendance = self.env['hr.attendance'].create({
+            'employee_id': self.employee_open.id,
+            'check_in': self._at(8),
+            'attendance_location_id': self.archived_location.id,
+        })
+        self.env['hr.attendance']._cron_auto_check_out()
+        self.assertFalse(attendance.check_out)
+
+        self.env['hr.attendance']._cron_close_stale_attendances()
+        self.assertEqual(attendance.check_out, self._at(20))
+        self.assertEqual(attendance.out_mode, 'auto_check_out')
@@ -0,0 +1,138 @@
+# tests/test_check_in_benchmark.py
+"""Check-in hot path benchmark.
+
+Not part of the standard test run, execute it explicitly with::
+
+    odoo-bin -d <db> -i ess_zb --test-tags ess_zb_benchmark --stop-after-init
+
+The size of the synthetic data set is controlled with the
+``ESS_ZB_BENCH_EMPLOYEES`` and ``ESS_ZB_BENCH_LOCATIONS`` environment
+variables. One JSON line prefixed with ``ess_zb benchmark`` is logged per
+run so that results can be compared across commits.
+"""
+import json
+import logging
+import math
+import os
+import random
+import time
+from unittest.mock import patch
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase, new_test_user
+
+_logger = logging.getLogger(__name__)
+
+
+def _percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(int(math.ceil(pct / 100 * len(ordered))) - 1, len(ordered) - 1)]
+
+
+@tagged('post_install', '-at_install', '-standard', 'ess_zb_benchmark')
+class TestCheckInBenchmark(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.employee_count = int(os.environ.get('ESS_ZB_BENCH_EMPLOYEES', 200))
+        cls.location_count = int(os.environ.get('ESS_ZB_BENCH_LOCATIONS', 1000))
+        rng = random.Random(42)
+
+        cls.locations = cls.env['hr.attendance.location'].create([{
+            'name': 'Bench Store %s' % index,
+            'latitude': rng.uniform(8.0, 28.0),
+            'longitude': rng.uniform(70.0, 88.0),
+            'radius_km': rng.choice([0.2, 0.5, 1.0]),
+        } for index in range(cls.location_count)])
+
+        cls.users = [
+            new_test_user(cls.env, login='ess_zb_bench_%s' % index, groups='base.group_user')
+            for index in range(cls.employee_count)
+        ]
+        employees = cls.env['hr.employee'].create([{
+            'name': 'Bench Employee %s' % index,
+            'user_id': user.id,
+        } for index, user in enumerate(cls.users)])
+
+        # a third of the employees get one or two dedicated locations, the
+        # others fall back to the company-wide locations
+        dedicated = cls.locations[:max(cls.location_count // 10, 1)]
+        cls.punch_points = []
+        for index, employee in enumerate(employees):
+            if index % 3 == 0:
+                assigned = dedicated[index % len(dedicated)] | dedicated[(index * 7) % len(dedicated)]
+                employee.attendance_location_ids = assigned
+                target = assigned[0]
+            else:
+                target = cls.locations[len(dedicated) + index % max(cls.location_count - len(dedicated), 1)]
+            # one punch in ten is taken outside of every geofence
+            if index % 10 == 9:
+                cls.punch_points.append((target.latitude + 0.5, target.longitude + 0.5))
+            else:
+                cls.punch_points.append((target.latitude + 0.0005, target.longitude - 0.0005))
+
+    def _measure(self, samples, call):
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        try:
+            call()
+        except UserError:
+            samples['rejected'] += 1
+        finally:
+            self.env.flush_all()
+            samples['latency'].append(time.perf_counter() - start)
+            samples['queries'].append(self.env.cr.sql_log_count - queries)
+
+    @staticmethod
+    def _summary(samples):
+        return {
+            'calls': len(samples['latency']),
+            'rejected': samples['rejected'],
+            'p50_ms': round(_percentile(samples['latency'], 50) * 1000, 3),
+            'p99_ms': round(_percentile(samples['latency'], 99) * 1000, 3),
+            'queries_p50': _percentile(samples['queries'], 50),
+            'queries_max': max(samples['queries'], default=0),
+        }
+
+    def test_check_in_hot_path(self):
+        Attendance = self.registry['hr.attendance']
+        validate_geofence = Attendance._validate_geofence
+        geofence = {'calls': 0, 'seconds': 0.0}
+
+        def timed_validate_geofence(model, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return validate_geofence(model, *args, **kwargs)
+            finally:
+                geofence['calls'] += 1
+                geofence['seconds'] += time.perf_counter() - start
+
+        stages = {name: {'latency': [], 'queries': [], 'rejected': 0} for name in ('status', 'check_in', 'check_out')}
+        with patch.object(Attendance, '_validate_geofence', timed_validate_geofence):
+            for user, (latitude, longitude) in zip(self.users, self.punch_points):
+                model = self.env['hr.attendance'].with_user(user)
+                self._measure(stages['status'], model.get_employee_attendance_status)
+                self._measure(stages['check_in'], lambda: model.employee_check_in(latitude, longitude))
+                self._measure(stages['check_out'], lambda: model.employee_check_out(latitude, longitude))
+
+        report = {
+            'employees': self.employee_count,
+            'locations': self.location_count,
+            'geofence_calls': geofence['calls'],
+            'geofence_ms_total': round(geofence['seconds'] * 1000, 3),
+            'geofence_us_avg': round(geofence['seconds'] / max(geofence['calls'], 1) * 1e6, 3),
+        }
+        report.update({name: self._summary(samples) for name, samples in stages.items()})
+        _logger.info('ess_zb benchmark %s', json.dumps(report, sort_keys=True))
+
+        # every rejected check-in must leave the employee checked out
+        self.assertEqual(stages['check_in']['rejected'], stages['check_out']['rejected'])
+        self.assertFalse(self.env['hr.attendance'].search_count([
+            ('employee_id.user_id', 'in', [user.id for user in self.users]),
+            ('check_out', '=', False),
+        ]))
@@ -0,0 +1,115 @@
+# tests/test_concurrent_check_in.py
+"""Parallel check-ins of a single employee.
+
+Every thread works in its own transaction, so the data set is committed in
+``setUpClass`` and removed again in ``tearDownClass``.
+"""
+import threading
+
+from odoo import api
+from odoo.exceptions import UserError
+from odoo.modules.registry import Registry
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase, get_db_name, new_test_user
+from odoo.tools import SQL
+
+LATITUDE = 12.9716
+LONGITUDE = 77.5946
+
+
+@tagged('post_install', '-at_install')
+class TestConcurrentCheckIn(BaseCase):
+
+    thread_count = 8
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.registry = Registry(get_db_name())
+        with cls.registry.cursor() as cr:
+            env = api.Environment(cr, api.SUPERUSER_ID, {})
+            user = new_test_user(env, login='ess_zb_concurrent_punch', groups='base.group_user')
+            location = env['hr.attendance.location'].create({
+                'name': 'Concurrent Punch Office',
+                'latitude': LATITUDE,
+                'longitude': LONGITUDE,
+                'radius_km': 0.5,
+            })
+            employee = env['hr.employee'].create({
+                'name': 'Concurrent Punch Employee',
+                'user_id': user.id,
+                'attendance_location_ids': [(6, 0, location.ids)],
+            })
+            cls.user_id, cls.employee_id, cls.location_id = user.id, employee.id, location.id
+
+    @classmethod
+    def tearDownClass(cls):
+        with cls.registry.cursor() as cr:
+            env = api.Environment(cr, api.SUPERUSER_ID, {})
+            env['hr.attendance'].search([('employee_id', '=', cls.employee_id)]).unlink()
+            env['hr.employee'].browse(cls.employee_id).unlink()
+            env['hr.attendance.location'].browse(cls.location_id).unlink()
+            env['res.users'].browse(cls.user_id).unlink()
+        super().tearDownClass()
+
+    def setUp(self):
+        super().setUp()
+        self.addCleanup(self._reset_attendances)
+
+    def _reset_attendances(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, api.SUPERUSER_ID, {})
+            env['hr.attendance'].search([('employee_id', '=', self.employee_id)]).unlink()
+
+    def _punch_concurrently(self, method):
+        """Call ``method`` of hr.attendance from ``thread_count`` transactions at once
+        
+        :return: ``(succeeded, rejected, failures)`` where ``rejected`` are the
+                 messages of the UserErrors and ``failures`` any other exception
+        """
+        barrier = threading.Barrier(self.thread_count)
+        succeeded, rejected, failures = [], [], []
+
+        def punch():
+            try:
+                with self.registry.cursor() as cr:
+                    env = api.Environment(cr, self.user_id, {})
+                    # take the snapshot before the race, as the authentication of a real request would
+                    cr.execute(SQL("SELECT 1"))
+                    barrier.wait(timeout=30)
+                    result = getattr(env['hr.attendance'], method)(LATITUDE, LONGITUDE)
+                succeeded.append(result)
+            except UserError as e:
+                rejected.append(str(e))
+            except Exception as e:  # noqa: BLE001
+                failures.append(e)
+
+        threads = [threading.Thread(target=punch) for __ in range(self.thread_count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=60)
+        return succeeded, rejected, failures
+
+    def _open_attendance_count(self):
+        with self.registry.cursor() as cr:
+            env = api.Environment(cr, api.SUPERUSER_ID, {})
+            return env['hr.attendance'].search_count([
+                ('employee_id', '=', self.employee_id),
+                ('check_out', '=', False),
+            ])
+
+    def test_parallel_check_in(self):
+        succeeded, rejected, failures = self._punch_concurrently('employee_check_in')
+        self.assertFalse(failures)
+        self.assertEqual(len(succeeded), 1)
+        self.assertEqual(len(rejected), self.thread_count - 1)
+        self.assertEqual(self._open_attendance_count(), 1)
+
+    def test_parallel_check_in_already_checked_in(self):
+        self._punch_concurrently('employee_check_in')
+        succeeded, rejected, failures = self._punch_concurrently('employee_check_in')
+        self.assertFalse(failures)
+        self.assertFalse(succeeded)
+        self.assertEqual(rejected, ['You are already checked in.'] * self.thread_count)
+        self.assertEqual(self._open_attendance_count(), 1)
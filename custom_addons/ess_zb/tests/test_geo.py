@@ -0,0 +1,197 @@
+# tests/test_geo.py
+import math
+import random
+
+from odoo.tests import tagged
+from odoo.tests.common import BaseCase
+
+from ..tools.geo import (
+    GEOHASH_PRECISION, GeofenceIndex, Polygon, geohash_encode, geohash_prefixes, haversine_km,
+)
+
+
+def _destination(latitude, longitude, bearing, distance_km):
+    """Point reached from a point by following a bearing (radians) for a distance"""
+    lat, lon = math.radians(latitude), math.radians(longitude)
+    delta = distance_km / 6371
+    lat2 = math.asin(math.sin(lat) * math.cos(delta) + math.cos(lat) * math.sin(delta) * math.cos(bearing))
+    lon2 = lon + math.atan2(
+        math.sin(bearing) * math.sin(delta) * math.cos(lat),
+        math.cos(delta) - math.sin(lat) * math.sin(lat2),
+    )
+    return math.degrees(lat2), (math.degrees(lon2) + 180.0) % 360.0 - 180.0
+
+
+def _random_center(rng):
+    """Centers anywhere, with extra weight on high latitudes and the antimeridian"""
+    kind = rng.random()
+    if kind < 0.25:
+        return rng.choice((-1, 1)) * rng.uniform(70.0, 89.99), rng.uniform(-180.0, 180.0)
+    if kind < 0.5:
+        return rng.uniform(-80.0, 80.0), rng.choice((-1, 1)) * rng.uniform(179.0, 180.0)
+    return rng.uniform(-90.0, 90.0), rng.uniform(-180.0, 180.0)
+
+
+def _linear_locate(entries, latitude, longitude, allowed=None):
+    """Reference :meth:`GeofenceIndex.locate`: scan of every location"""
+    entries = [entry for entry in entries if allowed is None or entry[0] in allowed]
+    if not entries:
+        return False, 0, None
+    containing = [
+        entry for entry in entries
+        if (entry[4].contains(latitude, longitude) if entry[4]
+            else haversine_km(latitude, longitude, entry[1], entry[2]) <= entry[3])
+    ]
+    if containing:
+        entry = min(containing)
+        return True, haversine_km(latitude, longitude, entry[1], entry[2]), entry[0]
+    distance, location_id = min(
+        (haversine_km(latitude, longitude, entry[1], entry[2]), entry[0]) for entry in entries)
+    return False, distance, location_id
+
+
+def _random_entries(rng, count, min_lat, max_lat, min_lon, max_lon, polygons=True):
+    """Overlapping circles and square polygons, ids shuffled to exercise the lowest id tie-break"""
+    ids = rng.sample(range(1, 10 * count), count)
+    entries = []
+    for location_id in ids:
+        latitude = rng.uniform(min_lat, max_lat)
+        longitude = (rng.uniform(min_lon, max_lon) + 180.0) % 360.0 - 180.0
+        radius_km = rng.choice([0.2, 0.5, 1.0, 3.0])
+        polygon = None
+        half = radius_km / 111.0
+        if polygons and rng.random() < 0.2 and abs(longitude) + 3 * half < 180.0 and abs(latitude) + half < 90.0:
+            # a lozenge, so that its bounding box is not the polygon itself
+            polygon = Polygon([
+                (latitude - half, longitude),
+                (latitude, longitude + 3 * half),
+                (latitude + half, longitude),
+                (latitude, longitude - 3 * half),
+            ])
+        entries.append((location_id, latitude, longitude, radius_km, polygon))
+    return entries
+
+
+def _random_points(rng, entries, count, min_lat, max_lat, min_lon, max_lon):
+    """Points close to the locations, on their edge and far from them"""
+    points = []
+    for __ in range(count):
+        kind = rng.random()
+        if kind < 0.6:
+            __, latitude, longitude, radius_km, __ = rng.choice(entries)
+            points.append(_destination(
+                latitude, longitude, rng.uniform(0, 2 * math.pi), radius_km * rng.uniform(0.0, 2.5)))
+        else:
+            points.append((
+                rng.uniform(min_lat, max_lat),
+                (rng.uniform(min_lon, max_lon) + 180.0) % 360.0 - 180.0,
+            ))
+    return points
+
+
+# (min_lat, max_lat, min_lon, max_lon) of the random data sets, longitudes
+# beyond 180 wrap around the antimeridian
+GEOFENCE_AREAS = {
+    'city': (12.8, 13.2, 77.4, 77.8),
+    'country': (8.0, 28.0, 70.0, 88.0),
+    'arctic': (75.0, 89.9, -180.0, 180.0),
+    'antimeridian': (-20.0, 20.0, 178.0, 182.0),
+}
+
+
+@tagged('post_install', '-at_install')
+class TestGeofenceIndex(BaseCase):
+
+    def _check_area(self, area, seed, count=300, cell_deg=None):
+        rng = random.Random(seed)
+        bounds = GEOFENCE_AREAS[area]
+        entries = _random_entries(rng, count, *bounds)
+        points = _random_points(rng, entries, 400, *bounds)
+        index = GeofenceIndex(entries, cell_deg=cell_deg)
+        small_allowed = {entry[0] for entry in rng.sample(entries, 10)}
+        large_allowed = {entry[0] for entry in rng.sample(entries, count // 2)}
+
+        for latitude, longitude in points:
+            message = "%s point (%s, %s)" % (area, latitude, longitude)
+            self.assertEqual(index.locate(latitude, longitude), _linear_locate(entries, latitude, longitude), message)
+            for allowed in (small_allowed, large_allowed):
+                self.assertEqual(
+                    index.locate(latitude, longitude, allowed=allowed),
+                    _linear_locate(entries, latitude, longitude, allowed=allowed),
+                    message,
+                )
+            expected = sorted(
+                (haversine_km(latitude, longitude, entry[1], entry[2]), entry[0]) for entry in entries)[:3]
+            self.assertEqual(index.nearest(latitude, longitude, k=3), expected, message)
+
+        for point, result in zip(points, index.locate_many(*zip(*points))):
+            expected = _linear_locate(entries, *point)
+            message = "%s point %s" % (area, point)
+            self.assertEqual((result[0], result[2]), (expected[0], expected[2]), message)
+            self.assertAlmostEqual(result[1], expected[1], places=6, msg=message)
+
+    def test_city(self):
+        self._check_area('city', 1)
+
+    def test_country(self):
+        self._check_area('country', 2)
+
+    def test_country_fine_grid(self):
+        self._check_area('country', 3, cell_deg=0.01)
+
+    def test_high_latitudes(self):
+        self._check_area('arctic', 4)
+
+    def test_antimeridian(self):
+        self._check_area('antimeridian', 5)
+
+    def test_empty_index(self):
+        self.assertEqual(GeofenceIndex([]).locate(12.9716, 77.5946), (False, 0, None))
+        self.assertEqual(GeofenceIndex([]).nearest(12.9716, 77.5946), [])
+
+
+@tagged('post_install', '-at_install')
+class TestPolygonDistance(BaseCase):
+
+    def test_distance_to_boundary(self):
+        # a campus of about 4 x 2 km, whose reference point is 2 km from its east edge
+        campus = Polygon([(12.97, 77.59), (12.97, 77.63), (12.99, 77.63), (12.99, 77.59)])
+        self.assertEqual(campus.distance_km(12.98, 77.61), 0.0)
+        # just east of the east edge, and beyond the north-east corner
+        self.assertAlmostEqual(
+            campus.distance_km(12.98, 77.631), haversine_km(12.98, 77.631, 12.98, 77.63), delta=1e-3)
+        self.assertAlmostEqual(
+            campus.distance_km(13.0, 77.64), haversine_km(13.0, 77.64, 12.99, 77.63), delta=1e-3)
+        self.assertLess(campus.distance_km(12.98, 77.631), 0.15)
+
+
+@tagged('post_install', '-at_install')
+class TestGeohashPrefixes(BaseCase):
+
+    def test_prefixes_cover_circle(self):
+        rng = random.Random(23)
+        for __ in range(500):
+            latitude, longitude = _random_center(rng)
+            radius_km = math.exp(rng.uniform(math.log(0.005), math.log(50.0)))
+            prefixes = geohash_prefixes(latitude, longitude, radius_km)
+            for __ in range(40):
+                # points on the edge are the ones a too narrow cover misses first
+                distance = radius_km * (0.999 if rng.random() < 0.5 else rng.random())
+                point = _destination(latitude, longitude, rng.uniform(0, 2 * math.pi), distance)
+                if haversine_km(latitude, longitude, *point) > radius_km:
+                    continue
+                geohash = geohash_encode(*point, GEOHASH_PRECISION)
+                self.assertTrue(
+                    any(geohash.startswith(prefix) for prefix in prefixes),
+                    "%s of %s not covered by %s for the circle (%s, %s, %s km)" % (
+                        geohash, point, prefixes, latitude, longitude, radius_km),
+                )
+
+    def test_prefixes_small_circle(self):
+        prefixes = geohash_prefixes(12.9716, 77.5946, 0.01)
+        self.assertLessEqual(len(prefixes), 9)
+        self.assertTrue(all(len(prefix) >= 6 for prefix in prefixes))
+        self.assertIn(geohash_encode(12.9716, 77.5946, len(prefixes[0])), prefixes)
+
+    def test_prefixes_huge_circle(self):
+        self.assertEqual(geohash_prefixes(0.0, 0.0, 10000.0), [''])
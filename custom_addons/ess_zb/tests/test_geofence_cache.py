@@ -0,0 +1,45 @@
+# tests/test_geofence_cache.py
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestGeofenceCache(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env['res.company'].create({'name': 'Geofence Cache Company'})
+        cls.location = cls.env['hr.attendance.location'].create({
+            'name': 'Geofence Cache Office',
+            'latitude': 12.9716,
+            'longitude': 77.5946,
+            'radius_km': 0.5,
+            'company_id': cls.company.id,
+        })
+
+    def _company_location_ids(self):
+        index = self.env['hr.attendance.location']._get_geofence_index(self.company.id)
+        return {entry[0] for entry in index.entries}
+
+    def test_employee_create_and_unlink(self):
+        self.assertIn(self.location.id, self._company_location_ids())
+        employee = self.env['hr.employee'].create({
+            'name': 'Geofence Cache Employee',
+            'company_id': self.company.id,
+            'attendance_location_ids': [(6, 0, self.location.ids)],
+        })
+        self.assertNotIn(self.location.id, self._company_location_ids())
+        employee.unlink()
+        self.assertIn(self.location.id, self._company_location_ids())
+
+    def test_employee_write(self):
+        employee = self.env['hr.employee'].create({
+            'name': 'Geofence Cache Employee',
+            'company_id': self.company.id,
+        })
+        self.assertIn(self.location.id, self._company_location_ids())
+        employee.attendance_location_ids = self.location
+        self.assertNotIn(self.location.id, self._company_location_ids())
+        employee.attendance_location_ids = False
+        self.assertIn(self.location.id, self._company_location_ids())
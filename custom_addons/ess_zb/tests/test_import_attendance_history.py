@@ -0,0 +1,93 @@
+# tests/test_import_attendance_history.py
+from datetime import date, datetime
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..tools.geo import geohash_encode
+
+LATITUDE = 12.9716
+LONGITUDE = 77.5946
+
+
+@tagged('post_install', '-at_install')
+class TestImportAttendanceHistory(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.location = cls.env['hr.attendance.location'].create({
+            'name': 'History Office',
+            'latitude': LATITUDE,
+            'longitude': LONGITUDE,
+            'radius_km': 0.5,
+        })
+        cls.employee, cls.other_employee = cls.env['hr.employee'].create([{
+            'name': 'History Employee',
+            'tz': 'UTC',
+            'attendance_location_ids': [(6, 0, cls.location.ids)],
+        }, {
+            'name': 'History Other Employee',
+            'tz': 'UTC',
+        }])
+
+    def test_mixed_chunks(self):
+        unknown_employee_id = self.env['hr.employee'].search([], order='id desc', limit=1).id + 1000
+        rows = [
+            {
+                'employee_id': self.employee.id,
+                'check_in': '2025-03-03 13:00:00',
+                'check_out': '2025-03-03 17:00:00',
+                'check_in_latitude': LATITUDE,
+                'check_in_longitude': LONGITUDE,
+                'check_out_latitude': LATITUDE + 0.1,
+                'check_out_longitude': LONGITUDE,
+            },
+            {'employee_id': self.employee.id, 'check_in': '2025-03-04 13:00:00'},
+            {'employee_id': self.employee.id, 'check_in': '2025-03-05 13:00:00'},
+            {'employee_id': self.employee.id},
+            {'employee_id': self.employee.id, 'check_in': '2025-03-06 13:00:00', 'check_out': '2025-03-06 12:00:00'},
+            {'employee_id': unknown_employee_id, 'check_in': '2025-03-06 13:00:00'},
+            {'employee_id': self.other_employee.id, 'check_in': '2025-03-03 09:00:00',
+             'check_out': '2025-03-03 11:00:00'},
+        ]
+        result = self.env['hr.attendance'].import_attendance_history(rows, batch_size=4)
+
+        self.assertEqual(result['imported'], 3)
+        self.assertEqual(sorted(result['errors']), [
+            (2, 'The employee already has an open attendance.'),
+            (3, 'Invalid attendance data.'),
+            (4, 'Check-out is earlier than check-in.'),
+            (5, 'Unknown employee.'),
+        ])
+
+        closed, open_attendance = self.env['hr.attendance'].search(
+            [('employee_id', '=', self.employee.id)], order='check_in')
+        self.assertAlmostEqual(closed.worked_hours, 4.0)
+        self.assertEqual(closed.attendance_location_id, self.location)
+        self.assertTrue(closed.is_within_geofence)
+        self.assertEqual(closed.check_in_location, f"{LATITUDE}, {LONGITUDE}")
+        self.assertEqual(closed.check_in_geohash, geohash_encode(LATITUDE, LONGITUDE))
+        self.assertEqual(closed.check_out_geohash, geohash_encode(LATITUDE + 0.1, LONGITUDE))
+        self.assertTrue(closed.geocode_pending)
+        self.assertEqual(open_attendance.check_in, datetime(2025, 3, 4, 13))
+        self.assertFalse(open_attendance.check_out)
+        self.assertFalse(open_attendance.check_in_geohash)
+        self.assertFalse(open_attendance.geocode_pending)
+        self.assertEqual(self.employee.current_attendance_id, open_attendance)
+
+        other = self.env['hr.attendance'].search([('employee_id', '=', self.other_employee.id)])
+        self.assertAlmostEqual(other.worked_hours, 2.0)
+        self.assertFalse(other.attendance_location_id)
+        self.assertFalse(self.other_employee.current_attendance_id)
+
+        self.env.cr.precommit.run()
+        summaries = self.env['hr.attendance.daily.summary'].search([
+            ('employee_id', 'in', (self.employee | self.other_employee).ids),
+            ('date', '=', date(2025, 3, 3)),
+        ])
+        self.assertEqual(
+            sorted((summary.employee_id.id, summary.location_id.id, round(summary.worked_hours, 2), summary.punch_count)
+                   for summary in summaries),
+            sorted([(self.employee.id, self.location.id, 4.0, 1), (self.other_employee.id, False, 2.0, 1)]),
+        )
@@ -0,0 +1,112 @@
+# tests/test_ingest_punches.py
+from datetime import timedelta
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase, new_test_user
+
+LATITUDE = 12.9716
+LONGITUDE = 77.5946
+
+
+@tagged('post_install', '-at_install')
+class TestIngestPunches(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.location = cls.env['hr.attendance.location'].create({
+            'name': 'Ingest Office',
+            'latitude': LATITUDE,
+            'longitude': LONGITUDE,
+            'radius_km': 0.5,
+        })
+        cls.user = new_test_user(cls.env, login='ess_zb_ingest_user', groups='base.group_user')
+        cls.manager = new_test_user(
+            cls.env, login='ess_zb_ingest_manager',
+            groups='base.group_user,hr_attendance.group_hr_attendance_manager')
+        cls.employee = cls.env['hr.employee'].create({
+            'name': 'Ingest Employee',
+            'user_id': cls.user.id,
+            'attendance_location_ids': [(6, 0, cls.location.ids)],
+        })
+        cls.other_employee = cls.env['hr.employee'].create({'name': 'Ingest Other Employee'})
+        cls.now = fields.Datetime.now().replace(microsecond=0)
+
+    def _punch(self, punch_type, hours_ago, client_uuid=None, employee=None, located=True):
+        punch = {
+            'employee_id': (employee or self.employee).id,
+            'type': punch_type,
+            'timestamp': fields.Datetime.to_string(self.now - timedelta(hours=hours_ago)),
+            'client_uuid': client_uuid,
+        }
+        if located:
+            punch.update(latitude=LATITUDE, longitude=LONGITUDE)
+        return punch
+
+    def _ingest(self, punches, user=None):
+        return self.env['hr.attendance'].with_user(user or self.user).ingest_punches(punches)
+
+    def _attendances(self, employee=None):
+        return self.env['hr.attendance'].search([('employee_id', '=', (employee or self.employee).id)])
+
+    def test_check_in_and_out_in_one_batch(self):
+        results = self._ingest([
+            self._punch('check_out', 1, 'out-1'),
+            self._punch('check_in', 3, 'in-1'),
+        ])
+        self.assertEqual([result['status'] for result in results], ['ok', 'ok'])
+        attendance = self._attendances()
+        self.assertEqual(len(attendance), 1)
+        self.assertEqual(results[0]['attendance_id'], attendance.id)
+        self.assertEqual(results[1]['attendance_id'], attendance.id)
+        self.assertEqual(attendance.check_in, self.now - timedelta(hours=3))
+        self.assertEqual(attendance.check_out, self.now - timedelta(hours=1))
+        self.assertEqual(attendance.attendance_location_id, self.location)
+        self.assertFalse(self.employee.current_attendance_id)
+
+    def test_duplicate_client_uuid_in_batch(self):
+        results = self._ingest([
+            self._punch('check_in', 3, 'in-1'),
+            self._punch('check_in', 3, 'in-1'),
+        ])
+        self.assertEqual(results[0]['status'], 'ok')
+        self.assertEqual(results[1], {'status': 'error', 'attendance_id': False, 'message': 'Duplicate punch.'})
+        self.assertEqual(len(self._attendances()), 1)
+
+    def test_replay_of_recorded_punches(self):
+        punches = [self._punch('check_in', 3, 'in-1'), self._punch('check_out', 1, 'out-1')]
+        first = self._ingest(punches)
+        replay = self._ingest(punches)
+        self.assertEqual(replay, first)
+        self.assertEqual([result['status'] for result in replay], ['ok', 'ok'])
+        self.assertEqual(len(self._attendances()), 1)
+
+    def test_punch_for_another_employee(self):
+        results = self._ingest([
+            self._punch('check_in', 3, employee=self.other_employee),
+            self._punch('check_in', 3),
+        ])
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertEqual(results[0]['message'], 'You can only record your own attendance.')
+        self.assertEqual(results[1]['status'], 'ok')
+        self.assertFalse(self._attendances(self.other_employee))
+
+    def test_failed_create_keeps_siblings(self):
+        # an earlier closed attendance overlaps the replayed check-in of the employee,
+        # managers may record punches without coordinates
+        self.env['hr.attendance'].create({
+            'employee_id': self.employee.id,
+            'check_in': self.now - timedelta(hours=6),
+            'check_out': self.now - timedelta(hours=2),
+        })
+        results = self._ingest([
+            self._punch('check_in', 4, employee=self.employee, located=False),
+            self._punch('check_in', 4, employee=self.other_employee, located=False),
+        ], user=self.manager)
+        self.assertEqual(results[0]['status'], 'error')
+        self.assertTrue(results[0]['message'])
+        self.assertEqual(results[1]['status'], 'ok')
+        self.assertEqual(len(self._attendances()), 1)
+        self.assertEqual(self._attendances(self.other_employee).id, results[1]['attendance_id'])
+        self.assertEqual(self.other_employee.current_attendance_id.id, results[1]['attendance_id'])
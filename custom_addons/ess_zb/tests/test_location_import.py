@@ -0,0 +1,93 @@
+# tests/test_location_import.py
+import base64
+import json
+
+from odoo.exceptions import UserError
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestLocationImport(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company = cls.env['res.company'].create({'name': 'Location Import Company'})
+
+    def _import(self, content, file_format='csv', update_existing=True):
+        wizard = self.env['hr.attendance.location.import.wizard'].create({
+            'file': base64.b64encode(content.encode()),
+            'file_format': file_format,
+            'company_id': self.company.id,
+            'update_existing': update_existing,
+        })
+        return wizard.action_import()
+
+    def _locations(self):
+        return self.env['hr.attendance.location'].search([('company_id', '=', self.company.id)], order='code')
+
+    def test_create_and_update_by_code(self):
+        action = self._import(
+            "code,name,latitude,longitude,radius_km,address\n"
+            "BLR,Bengaluru,12.9716,77.5946,0.5,MG Road\n"
+            "MAA,Chennai,13.0827,80.2707,,\n"
+        )
+        self.assertEqual(action['params']['message'], '2 locations created, 0 updated.')
+        blr, maa = self._locations()
+        self.assertEqual((blr.name, blr.radius_km, blr.address), ('Bengaluru', 0.5, 'MG Road'))
+        self.assertEqual(maa.radius_km, 0.5)
+        self.assertTrue(blr.active)
+        self.assertAlmostEqual(blr.bbox_min_latitude, 12.9716 - 0.5 / 111.19, places=4)
+        self.assertIn(blr.id, {
+            entry[0] for entry in self.env['hr.attendance.location']._get_geofence_index(self.company.id).entries})
+
+        action = self._import(
+            "code,name,latitude,longitude,radius_km\n"
+            "BLR,Bengaluru HQ,12.9800,77.6000,1.0\n"
+            "HYD,Hyderabad,17.3850,78.4867,0.5\n"
+        )
+        self.assertEqual(action['params']['message'], '1 locations created, 1 updated.')
+        self.assertEqual(self._locations().mapped('code'), ['BLR', 'HYD', 'MAA'])
+        blr.invalidate_recordset()
+        self.assertEqual((blr.name, blr.latitude, blr.radius_km), ('Bengaluru HQ', 12.98, 1.0))
+        self.assertAlmostEqual(blr.bbox_min_latitude, 12.98 - 1.0 / 111.19, places=4)
+        # the geofence index was rebuilt with the new coordinates
+        index = self.env['hr.attendance.location']._get_geofence_index(self.company.id)
+        self.assertEqual(index.locate(12.98, 77.60)[2], blr.id)
+
+    def test_skip_existing(self):
+        self._import("code,name,latitude,longitude\nBLR,Bengaluru,12.9716,77.5946\n")
+        action = self._import(
+            "code,name,latitude,longitude\nBLR,Renamed,12.9716,77.5946\nMAA,Chennai,13.0827,80.2707\n",
+            update_existing=False,
+        )
+        self.assertEqual(action['params']['message'], '1 locations created, 0 updated.')
+        self.assertEqual(self._locations().mapped('name'), ['Bengaluru', 'Chennai'])
+
+    def test_geojson(self):
+        polygon = {'type': 'Polygon', 'coordinates': [[
+            [77.59, 12.97], [77.60, 12.97], [77.60, 12.98], [77.59, 12.98], [77.59, 12.97],
+        ]]}
+        self._import(json.dumps({'type': 'FeatureCollection', 'features': [
+            {'type': 'Feature', 'properties': {'code': 'P1', 'name': 'Campus'}, 'geometry': polygon},
+            {'type': 'Feature', 'properties': {'code': 'P2', 'name': 'Gate', 'radius_km': 0.2},
+             'geometry': {'type': 'Point', 'coordinates': [77.5946, 12.9716]}},
+        ]}), file_format='geojson')
+        campus, gate = self._locations()
+        self.assertEqual(campus.geofence_type, 'polygon')
+        self.assertAlmostEqual(campus.latitude, 12.975)
+        self.assertAlmostEqual(campus.bbox_max_longitude, 77.60)
+        self.assertEqual((gate.geofence_type, gate.radius_km), ('circle', 0.2))
+
+    def test_rejected_file(self):
+        with self.assertRaisesRegex(UserError, 'Line 2: Radius must be greater than 0'):
+            self._import(json.dumps({'type': 'FeatureCollection', 'features': [
+                {'type': 'Feature', 'properties': {'code': 'P1', 'name': 'Gate'},
+                 'geometry': {'type': 'Point', 'coordinates': [77.5946, 12.9716]}},
+                {'type': 'Feature', 'properties': {'code': 'P2', 'name': 'Zero', 'radius_km': 0},
+                 'geometry': {'type': 'Point', 'coordinates': [77.5946, 12.9716]}},
+            ]}), file_format='geojson')
+        with self.assertRaisesRegex(UserError, 'Line 2: Invalid coordinates'):
+            self._import("code,name,latitude,longitude\nBLR,Bengaluru,12.9716,77.5946\nBAD,Bad,95,77.59\n")
+        self.assertFalse(self._locations())
@@ -0,0 +1,67 @@
+# tests/test_presence_events.py
+from datetime import timedelta
+from unittest.mock import patch
+
+from odoo import fields
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+from ..models.hr_attendance import HrAttendance
+
+
+@tagged('post_install', '-at_install')
+class TestPresenceEvents(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.employee, cls.other_employee = cls.env['hr.employee'].create([
+            {'name': 'Presence Employee'},
+            {'name': 'Presence Other Employee'},
+        ])
+        cls.now = fields.Datetime.now().replace(microsecond=0)
+
+    def _capture(self):
+        """Patch the presence notification; return the list of ``(event, attendance ids)`` it receives"""
+        events = []
+
+        def notify(attendances, event):
+            if attendances:
+                events.append((event, sorted(attendances.ids)))
+
+        patcher = patch.object(HrAttendance, '_notify_presence', autospec=True, side_effect=notify)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return events
+
+    def test_create(self):
+        events = self._capture()
+        opened, closed = self.env['hr.attendance'].create([{
+            'employee_id': self.employee.id,
+            'check_in': self.now - timedelta(hours=1),
+        }, {
+            'employee_id': self.other_employee.id,
+            'check_in': self.now - timedelta(hours=3),
+            'check_out': self.now - timedelta(hours=2),
+        }])
+        self.assertTrue(closed.exists())
+        self.assertEqual(events, [('check_in', opened.ids)])
+
+    def test_write_check_out(self):
+        attendance = self.env['hr.attendance'].create({
+            'employee_id': self.employee.id,
+            'check_in': self.now - timedelta(hours=2),
+        })
+        events = self._capture()
+        attendance.write({'check_in': self.now - timedelta(hours=3)})
+        self.assertEqual(events, [])
+
+        attendance.write({'check_out': self.now - timedelta(hours=1)})
+        self.assertEqual(events, [('check_out', attendance.ids)])
+
+        # moving an existing check-out does not change the presence
+        attendance.write({'check_out': self.now})
+        self.assertEqual(len(events), 1)
+
+        attendance.write({'check_out': False})
+        self.assertEqual(events[1:], [('check_in', attendance.ids)])
@@ -0,0 +1,85 @@
+# tests/test_search_punches_near.py
+from datetime import datetime
+
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase, new_test_user
+
+from ..tools.geo import geohash_encode
+
+LATITUDE = 12.9716
+LONGITUDE = 77.5946
+
+
+@tagged('post_install', '-at_install')
+class TestSearchPunchesNear(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.manager = new_test_user(
+            cls.env, login='ess_zb_near_manager',
+            groups='base.group_user,hr_attendance.group_hr_attendance_manager')
+        cls.employee = cls.env['hr.employee'].create({'name': 'Near Employee'})
+        # about 111 m north of the center per 0.001 degree, the check-out of
+        # the first attendance is 11 km away
+        cls.near_in, cls.near_both = cls.env['hr.attendance'].create([{
+            'employee_id': cls.employee.id,
+            'check_in': datetime(2026, 1, 10, 9),
+            'check_out': datetime(2026, 1, 10, 17),
+            'check_in_latitude': LATITUDE + 0.001,
+            'check_in_longitude': LONGITUDE,
+            'check_out_latitude': LATITUDE + 0.1,
+            'check_out_longitude': LONGITUDE,
+        }, {
+            'employee_id': cls.employee.id,
+            'check_in': datetime(2026, 1, 12, 9),
+            'check_out': datetime(2026, 1, 12, 17),
+            'check_in_latitude': LATITUDE + 0.002,
+            'check_in_longitude': LONGITUDE,
+            'check_out_latitude': LATITUDE + 0.0025,
+            'check_out_longitude': LONGITUDE,
+        }])
+        cls.archived = cls.env['hr.attendance.archive'].create({
+            'original_id': 0,
+            'employee_id': cls.employee.id,
+            'check_in': datetime(2025, 12, 1, 9),
+            'check_out': datetime(2025, 12, 1, 17),
+            'check_in_latitude': LATITUDE + 0.003,
+            'check_in_longitude': LONGITUDE,
+            'check_in_geohash': geohash_encode(LATITUDE + 0.003, LONGITUDE),
+            'check_out_latitude': LATITUDE + 0.1,
+            'check_out_longitude': LONGITUDE,
+            'check_out_geohash': geohash_encode(LATITUDE + 0.1, LONGITUDE),
+        })
+
+    def _search(self, radius_km=0.5, **kwargs):
+        punches = self.env['hr.attendance'].with_user(self.manager).search_punches_near(
+            LATITUDE, LONGITUDE, radius_km, **kwargs)
+        return [
+            (punch['attendance_id'] or punch['archive_id'], punch['punch'])
+            for punch in punches if punch['employee_id'] == self.employee.id
+        ]
+
+    def test_live_and_archived_nearest_first(self):
+        self.assertEqual(self._search(), [
+            (self.near_in.id, 'check_in'),
+            (self.near_both.id, 'check_in'),
+            (self.near_both.id, 'check_out'),
+            (self.archived.id, 'check_in'),
+        ])
+
+    def test_radius(self):
+        self.assertEqual(self._search(radius_km=0.15), [(self.near_in.id, 'check_in')])
+        self.assertIn((self.near_in.id, 'check_out'), self._search(radius_km=12))
+        self.assertIn((self.archived.id, 'check_out'), self._search(radius_km=12))
+
+    def test_date_bounds(self):
+        self.assertEqual(self._search(date_from='2026-01-10', date_to='2026-01-12'), [
+            (self.near_in.id, 'check_in'),
+        ])
+        # date_from is inclusive and date_to exclusive
+        self.assertEqual(self._search(date_from='2026-01-12 09:00:00', date_to='2026-01-12 17:00:00'), [
+            (self.near_both.id, 'check_in'),
+        ])
+        self.assertEqual(self._search(date_to='2026-01-01'), [(self.archived.id, 'check_in')])
+        self.assertEqual(self._search(date_from='2026-01-13'), [])
@@ -0,0 +1,44 @@
+# tests/test_validate_geofence_batch.py
+from odoo.tests import tagged
+from odoo.tests.common import TransactionCase
+
+
+@tagged('post_install', '-at_install')
+class TestValidateGeofenceBatch(TransactionCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.company_a = cls.env.company
+        cls.company_b = cls.env['res.company'].create({'name': 'Geofence Batch Company B'})
+        cls.location_a, cls.location_b = cls.env['hr.attendance.location'].create([{
+            'name': 'Bengaluru Office',
+            'latitude': 12.9716,
+            'longitude': 77.5946,
+            'radius_km': 0.5,
+            'company_id': cls.company_a.id,
+        }, {
+            'name': 'Chennai Office',
+            'latitude': 13.0827,
+            'longitude': 80.2707,
+            'radius_km': 0.5,
+            'company_id': cls.company_b.id,
+        }])
+        cls.employee_a, cls.employee_b = cls.env['hr.employee'].create([{
+            'name': 'Company A Employee',
+            'company_id': cls.company_a.id,
+        }, {
+            'name': 'Company B Employee',
+            'company_id': cls.company_b.id,
+        }])
+
+    def test_fallback_on_the_company_of_each_employee(self):
+        self.assertEqual(self.env.company, self.company_a)
+        results = self.env['hr.attendance'].validate_geofence_batch(
+            [(12.9716, 77.5946), (13.0827, 80.2707), (12.9716, 77.5946)],
+            [self.employee_a.id, self.employee_b.id, self.employee_b.id],
+        )
+        self.assertEqual(
+            [(result['is_within_geofence'], result['location_id']) for result in results],
+            [(True, self.location_a.id), (True, self.location_b.id), (False, self.location_b.id)],
+        )
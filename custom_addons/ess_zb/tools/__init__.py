@@ -0,0 +1,4 @@
+# tools/__init__.py
+from . import geo
+from . import perf
+from . import tz
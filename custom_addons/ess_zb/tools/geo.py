@@ -0,0 +1,440 @@
+# tools/geo.py
+import json
+import math
+from array import array
+from collections import defaultdict
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+EARTH_RADIUS_KM = 6371
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+# Length of the stored geohashes, cells of about 4.8 m x 4.8 m
+GEOHASH_PRECISION = 9
+
+# Upper bound on the size of a point x location distance matrix evaluated
+# at once by ``GeofenceIndex.locate_many``.
+MATRIX_CHUNK_CELLS = 2_000_000
+
+# Locations whose circle spans more cells than this are kept out of the grid
+# and checked on every lookup instead.
+MAX_COVER_CELLS = 4096
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Calculate distance between two coordinates using Haversine formula"""
+    dlat = math.radians(lat2 - lat1)
+    dlon = math.radians(lon2 - lon1)
+    a = (math.sin(dlat / 2) * math.sin(dlat / 2) +
+         math.cos(math.radians(lat1)) * math.cos(math.radians(lat2)) *
+         math.sin(dlon / 2) * math.sin(dlon / 2))
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c
+
+
+def haversine_km_pairs(lat1, lon1, lat2, lon2):
+    """Element-wise :func:`haversine_km` over equally long sequences of degrees
+
+    Vectorized with numpy when it is available; returns a list of distances.
+    """
+    if numpy is None:
+        return [haversine_km(*point) for point in zip(lat1, lon1, lat2, lon2)]
+    lat1, lon1, lat2, lon2 = (numpy.radians(numpy.asarray(values, dtype=float)) for values in (lat1, lon1, lat2, lon2))
+    a = numpy.sin((lat2 - lat1) / 2) ** 2 + numpy.cos(lat1) * numpy.cos(lat2) * numpy.sin((lon2 - lon1) / 2) ** 2
+    return (2 * EARTH_RADIUS_KM * numpy.arctan2(numpy.sqrt(a), numpy.sqrt(1 - a))).tolist()
+
+
+def _lon_km_per_degree(latitude):
+    return KM_PER_DEGREE * max(math.cos(math.radians(min(abs(latitude), 90.0))), 1e-6)
+
+
+def invalid_circles(latitudes, longitudes, radii):
+    """Positions of the circles with out of range coordinates or a radius not greater than 0
+
+    NaN values are invalid. Vectorized with numpy when it is available.
+    """
+    if numpy is None:
+        return [
+            position for position, (lat, lon, radius) in enumerate(zip(latitudes, longitudes, radii))
+            if not (-90 <= lat <= 90 and -180 <= lon <= 180 and radius > 0)
+        ]
+    lat = numpy.asarray(latitudes, dtype=float)
+    lon = numpy.asarray(longitudes, dtype=float)
+    radius = numpy.asarray(radii, dtype=float)
+    valid = (lat >= -90) & (lat <= 90) & (lon >= -180) & (lon <= 180) & (radius > 0)
+    return numpy.flatnonzero(~valid).tolist()
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Geohash of a point, ``precision`` characters long"""
+    lat_low, lat_high = -90.0, 90.0
+    lon_low, lon_high = -180.0, 180.0
+    chars = []
+    bits = bit_count = 0
+    even = True
+    while len(chars) < precision:
+        if even:
+            middle = (lon_low + lon_high) / 2
+            if longitude >= middle:
+                bits, lon_low = bits * 2 + 1, middle
+            else:
+                bits, lon_high = bits * 2, middle
+        else:
+            middle = (lat_low + lat_high) / 2
+            if latitude >= middle:
+                bits, lat_low = bits * 2 + 1, middle
+            else:
+                bits, lat_high = bits * 2, middle
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = bit_count = 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """``(latitude, longitude)`` size in degrees of the cells of a geohash precision"""
+    lat_bits = 5 * precision // 2
+    return 180.0 / 2 ** lat_bits, 360.0 / 2 ** (5 * precision - lat_bits)
+
+
+def geohash_prefixes(latitude, longitude, radius_km, precision=GEOHASH_PRECISION):
+    """Geohash prefixes whose cells together cover a circle
+
+    The longest prefix length whose cells are at least as large as the circle
+    is used, so that the cell of the center and its 8 neighbours cover it.
+    Geohashes of ``precision`` characters within the circle all start with one
+    of the returned prefixes; ``['']`` is returned for circles too large to
+    narrow anything down.
+    """
+    dlat = radius_km / KM_PER_DEGREE
+    dlon = radius_km / _lon_km_per_degree(latitude)
+    for length in range(precision, 0, -1):
+        cell_lat, cell_lon = geohash_cell_size(length)
+        if cell_lat >= dlat and cell_lon >= dlon:
+            break
+    else:
+        return ['']
+    prefixes = set()
+    for row in (-1, 0, 1):
+        lat = min(max(latitude + row * cell_lat, -90.0), 90.0)
+        for col in (-1, 0, 1):
+            lon = (longitude + col * cell_lon + 180.0) % 360.0 - 180.0
+            prefixes.add(geohash_encode(lat, lon, length))
+    return sorted(prefixes)
+
+
+class Polygon:
+    """Polygon geofence kept as a bounding box plus compact vertex arrays."""
+
+    __slots__ = ('min_lat', 'min_lon', 'max_lat', 'max_lon', 'lats', 'lons')
+
+    def __init__(self, vertices):
+        """:param vertices: sequence of ``(latitude, longitude)`` pairs of the outer ring"""
+        vertices = [(float(lat), float(lon)) for lat, lon in vertices]
+        if len(vertices) > 1 and vertices[0] == vertices[-1]:
+            vertices.pop()
+        if len(vertices) < 3:
+            raise ValueError("A polygon needs at least 3 vertices")
+        if not all(-90 <= lat <= 90 and -180 <= lon <= 180 for lat, lon in vertices):
+            raise ValueError("Polygon coordinates are out of range")
+        self.lats = array('d', (lat for lat, __ in vertices))
+        self.lons = array('d', (lon for __, lon in vertices))
+        self.min_lat, self.max_lat = min(self.lats), max(self.lats)
+        self.min_lon, self.max_lon = min(self.lons), max(self.lons)
+
+    @classmethod
+    def from_geojson(cls, text):
+        """Build a polygon from a GeoJSON ``Polygon`` geometry or ``Feature``; holes are ignored."""
+        try:
+            geometry = json.loads(text)
+        except (TypeError, ValueError):
+            raise ValueError("Invalid GeoJSON")
+        if isinstance(geometry, dict) and geometry.get('type') == 'Feature':
+            geometry = geometry.get('geometry')
+        if not isinstance(geometry, dict) or geometry.get('type') != 'Polygon':
+            raise ValueError("GeoJSON must be a Polygon geometry or Feature")
+        try:
+            ring = geometry['coordinates'][0]
+            return cls([(point[1], point[0]) for point in ring])
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("Invalid GeoJSON polygon coordinates")
+
+    @property
+    def centroid(self):
+        """Vertex average, used as a default reference point"""
+        return sum(self.lats) / len(self.lats), sum(self.lons) / len(self.lons)
+
+    def contains(self, latitude, longitude):
+        """Bounding-box rejection followed by an even-odd ray casting test"""
+        if not (self.min_lat <= latitude <= self.max_lat and self.min_lon <= longitude <= self.max_lon):
+            return False
+        lats, lons = self.lats, self.lons
+        inside = False
+        j = len(lats) - 1
+        for i in range(len(lats)):
+            lat_i, lat_j = lats[i], lats[j]
+            if (lat_i > latitude) != (lat_j > latitude):
+                crossing = lons[i] + (latitude - lat_i) * (lons[j] - lons[i]) / (lat_j - lat_i)
+                if longitude < crossing:
+                    inside = not inside
+            j = i
+        return inside
+
+    def distance_km(self, latitude, longitude):
+        """Distance from a point to the boundary of the polygon, 0 inside
+
+        Edges are measured on a local equirectangular projection centered on
+        the point, which is accurate at geofence scale.
+        """
+        if self.contains(latitude, longitude):
+            return 0.0
+        lon_km = _lon_km_per_degree(latitude)
+        xs = [(lon - longitude) * lon_km for lon in self.lons]
+        ys = [(lat - latitude) * KM_PER_DEGREE for lat in self.lats]
+        distance = math.inf
+        j = len(xs) - 1
+        for i in range(len(xs)):
+            dx, dy = xs[i] - xs[j], ys[i] - ys[j]
+            length = dx * dx + dy * dy
+            t = min(max(-(xs[j] * dx + ys[j] * dy) / length, 0.0), 1.0) if length else 0.0
+            distance = min(distance, math.hypot(xs[j] + t * dx, ys[j] + t * dy))
+            j = i
+        return distance
+
+    def contains_many(self, latitudes, longitudes):
+        """Vectorized :meth:`contains` over numpy arrays of degrees"""
+        inside = numpy.zeros(latitudes.shape, dtype=bool)
+        candidates = numpy.flatnonzero(
+            (latitudes >= self.min_lat) & (latitudes <= self.max_lat) &
+            (longitudes >= self.min_lon) & (longitudes <= self.max_lon)
+        )
+        if not len(candidates):
+            return inside
+        lat = latitudes[candidates]
+        lon = longitudes[candidates]
+        hits = numpy.zeros(lat.shape, dtype=bool)
+        lats = numpy.frombuffer(self.lats, dtype=float)
+        lons = numpy.frombuffer(self.lons, dtype=float)
+        for i in range(len(lats)):
+            j = i - 1
+            straddles = (lats[i] > lat) != (lats[j] > lat)
+            if not straddles.any():
+                continue
+            with numpy.errstate(divide='ignore', invalid='ignore'):
+                crossing = lons[i] + (lat - lats[i]) * (lons[j] - lons[i]) / (lats[j] - lats[i])
+            hits ^= straddles & (lon < crossing)
+        inside[candidates] = hits
+        return inside
+
+
+class GeofenceIndex:
+    """Uniform latitude/longitude grid over circular and polygon geofences.
+
+    Every location is registered in the cells its circle or polygon bounding
+    box overlaps (used to answer "which geofence contains this point" by
+    looking at a single cell) and in the cell holding its reference point
+    (used for the ring search that finds the nearest locations when no
+    geofence matches). Distances are always measured to the reference point.
+    """
+
+    __slots__ = ('cell_deg', 'entries', '_by_id', '_rows', '_cols', '_cover', '_wide', '_centers')
+
+    def __init__(self, entries, cell_deg=None):
+        """:param entries: iterable of ``(location_id, latitude, longitude, radius_km)``
+                           tuples, optionally followed by a :class:`Polygon`
+        """
+        self.entries = tuple(sorted(
+            entry if len(entry) == 5 else tuple(entry) + (None,)
+            for entry in entries
+        ))
+        self._by_id = {entry[0]: entry for entry in self.entries}
+        if cell_deg is None:
+            cell_deg = self._default_cell_deg(self.entries)
+        self.cell_deg = cell_deg
+        self._rows = max(int(math.ceil(180.0 / cell_deg)), 1)
+        self._cols = max(int(math.ceil(360.0 / cell_deg)), 1)
+        cover = defaultdict(list)
+        centers = defaultdict(list)
+        wide = []
+        for entry in self.entries:
+            __, lat, lon, radius, polygon = entry
+            centers[self._cell(lat, lon)].append(entry)
+            if polygon:
+                cells = self._cover_cells(polygon.min_lat, polygon.min_lon, polygon.max_lat, polygon.max_lon)
+            else:
+                dlat, dlon = self.circle_extent(lat, radius)
+                cells = self._cover_cells(lat - dlat, lon - dlon, lat + dlat, lon + dlon)
+            if cells is None:
+                wide.append(entry)
+                continue
+            for cell in cells:
+                cover[cell].append(entry)
+        self._cover = {cell: tuple(bucket) for cell, bucket in cover.items()}
+        self._centers = {cell: tuple(bucket) for cell, bucket in centers.items()}
+        self._wide = tuple(wide)
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def _default_cell_deg(entries):
+        if not entries:
+            return 1.0
+        radii = sorted(entry[3] for entry in entries)
+        median = radii[len(radii) // 2]
+        return min(max(2 * median / KM_PER_DEGREE, 0.005), 1.0)
+
+    def _row(self, latitude):
+        return min(max(int((latitude + 90.0) // self.cell_deg), 0), self._rows - 1)
+
+    def _col(self, longitude):
+        return int((longitude + 180.0) // self.cell_deg) % self._cols
+
+    def _cell(self, latitude, longitude):
+        return self._row(latitude), self._col(longitude)
+
+    @staticmethod
+    def circle_extent(latitude, radius_km):
+        """Return the half height and half width in degrees of a circle's bounding box"""
+        return radius_km / KM_PER_DEGREE, min(radius_km / _lon_km_per_degree(latitude), 360.0)
+
+    def _cover_cells(self, min_lat, min_lon, max_lat, max_lon):
+        row_min, row_max = self._row(min_lat), self._row(max_lat)
+        if max_lon - min_lon >= 360.0 or max_lat >= 90.0 or min_lat <= -90.0:
+            span = self._cols
+            col_min = 0
+        else:
+            col_min = int((min_lon + 180.0) // self.cell_deg)
+            span = int((max_lon + 180.0) // self.cell_deg) - col_min + 1
+        span = min(span, self._cols)
+        if (row_max - row_min + 1) * span > MAX_COVER_CELLS:
+            return None
+        return [
+            (row, (col_min + offset) % self._cols)
+            for row in range(row_min, row_max + 1)
+            for offset in range(span)
+        ]
+
+    def _allowed_entries(self, allowed):
+        return [self._by_id[location_id] for location_id in allowed if location_id in self._by_id]
+
+    def locate(self, latitude, longitude, allowed=None):
+        """Return ``(is_within, distance_km, location_id)`` for a point.
+
+        The containing location with the lowest id wins; when no geofence
+        contains the point the nearest location is returned instead.
+        ``location_id`` is ``None`` when there is no candidate at all.
+
+        :param allowed: optional set of location ids the lookup is restricted to
+        """
+        match = None
+        bucket = self._cover.get(self._cell(latitude, longitude), ())
+        for entry in bucket + self._wide if self._wide else bucket:
+            location_id, lat, lon, radius, polygon = entry
+            if allowed is not None and location_id not in allowed:
+                continue
+            if match is not None and location_id > match[1]:
+                continue
+            if polygon:
+                if polygon.contains(latitude, longitude):
+                    match = (haversine_km(latitude, longitude, lat, lon), location_id)
+                continue
+            distance = haversine_km(latitude, longitude, lat, lon)
+            if distance <= radius:
+                match = (distance, location_id)
+        if match:
+            return True, match[0], match[1]
+        nearest = self.nearest(latitude, longitude, allowed=allowed)
+        if not nearest:
+            return False, 0, None
+        return False, nearest[0][0], nearest[0][1]
+
+    def locate_many(self, latitudes, longitudes):
+        """Vectorized :meth:`locate` over sequences of coordinates.
+
+        Distances are evaluated as point x location matrices in bounded
+        chunks when numpy is available, falling back to per-point lookups.
+        """
+        if numpy is None or not self.entries:
+            return [self.locate(lat, lon) for lat, lon in zip(latitudes, longitudes)]
+        ids = numpy.array([entry[0] for entry in self.entries])
+        radii = numpy.array([entry[3] for entry in self.entries])
+        loc_lat = numpy.radians([entry[1] for entry in self.entries])
+        loc_lon = numpy.radians([entry[2] for entry in self.entries])
+        cos_loc_lat = numpy.cos(loc_lat)
+        polygons = [(column, entry[4]) for column, entry in enumerate(self.entries) if entry[4]]
+        lat = numpy.radians(numpy.asarray(latitudes, dtype=float))
+        lon = numpy.radians(numpy.asarray(longitudes, dtype=float))
+        chunk = max(MATRIX_CHUNK_CELLS // len(self.entries), 1)
+        results = []
+        for start in range(0, len(lat), chunk):
+            p_lat = lat[start:start + chunk, None]
+            p_lon = lon[start:start + chunk, None]
+            a = (numpy.sin((loc_lat - p_lat) / 2) ** 2 +
+                 numpy.cos(p_lat) * cos_loc_lat * numpy.sin((loc_lon - p_lon) / 2) ** 2)
+            distances = 2 * EARTH_RADIUS_KM * numpy.arctan2(numpy.sqrt(a), numpy.sqrt(1 - a))
+            inside = distances <= radii
+            for column, polygon in polygons:
+                inside[:, column] = polygon.contains_many(
+                    numpy.degrees(p_lat[:, 0]), numpy.degrees(p_lon[:, 0]))
+            # entries are sorted by id, so the first hit is the lowest id
+            column = numpy.where(inside.any(axis=1), inside.argmax(axis=1), distances.argmin(axis=1))
+            rows = numpy.arange(len(column))
+            for within, distance, location_id in zip(
+                inside[rows, column].tolist(), distances[rows, column].tolist(), ids[column].tolist()
+            ):
+                results.append((within, distance, location_id))
+        return results
+
+    def nearest(self, latitude, longitude, k=1, allowed=None):
+        """Return up to ``k`` ``(distance_km, location_id)`` pairs, nearest first."""
+        if allowed is not None and len(allowed) <= 64:
+            return self._nearest_linear(latitude, longitude, k, self._allowed_entries(allowed))
+        if not self.entries:
+            return []
+        row, col = self._cell(latitude, longitude)
+        found = []
+        ring = 0
+        # Each ring costs as many cell probes as it has cells; once that
+        # exceeds a plain scan, finish with the scan.
+        while (2 * ring + 1) ** 2 <= 4 * len(self.entries):
+            for cell in self._ring_cells(row, col, ring):
+                for location_id, lat, lon, __, __ in self._centers.get(cell, ()):
+                    if allowed is None or location_id in allowed:
+                        found.append((haversine_km(latitude, longitude, lat, lon), location_id))
+            if len(found) >= k:
+                found.sort()
+                # Anything outside the rings visited so far is at least this
+                # far away; the margin absorbs great-circle vs grid skew.
+                edge_lat = min(abs(latitude) + (ring + 1) * self.cell_deg, 90.0)
+                bound = 0.9 * ring * self.cell_deg * _lon_km_per_degree(edge_lat)
+                if found[k - 1][0] <= bound:
+                    return found[:k]
+            ring += 1
+        entries = self.entries if allowed is None else self._allowed_entries(allowed)
+        return self._nearest_linear(latitude, longitude, k, entries)
+
+    def _ring_cells(self, row, col, ring):
+        if ring == 0:
+            return [(row, col)]
+        cells = set()
+        for offset in range(-ring, ring + 1):
+            for r, c in ((row - ring, col + offset), (row + ring, col + offset),
+                         (row + offset, col - ring), (row + offset, col + ring)):
+                if 0 <= r < self._rows:
+                    cells.add((r, c % self._cols))
+        return cells
+
+    @staticmethod
+    def _nearest_linear(latitude, longitude, k, entries):
+        distances = sorted(
+            (haversine_km(latitude, longitude, lat, lon), location_id)
+            for location_id, lat, lon, __, __ in entries
+        )
+        return distances[:k]
@@ -0,0 +1,78 @@
+# tools/perf.py
+"""Opt-in stage timing for the attendance RPCs.
+
+Enable it by raising the ``odoo.addons.ess_zb.perf`` logger to DEBUG, e.g.
+``--log-handler odoo.addons.ess_zb.perf:DEBUG``. Each instrumented call then
+logs one JSON line with the duration and query count of every stage. When
+the logger is not enabled the timer is a shared no-op object.
+"""
+import json
+import logging
+import time
+from contextlib import contextmanager, nullcontext
+
+_logger = logging.getLogger('odoo.addons.ess_zb.perf')
+
+
+class StageTimer:
+
+    def __init__(self, rpc, env):
+        self.rpc = rpc
+        self.env = env
+        self.stages = {}
+        self._start = time.perf_counter()
+        self._queries = env.cr.sql_log_count
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        queries = self.env.cr.sql_log_count
+        try:
+            yield
+        finally:
+            elapsed, count = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (
+                elapsed + time.perf_counter() - start,
+                count + self.env.cr.sql_log_count - queries,
+            )
+
+    def flush(self):
+        """Run pending stored computes now so that they get their own stage"""
+        with self.stage('flush'):
+            self.env.flush_all()
+
+    def log(self, **extra):
+        line = {
+            'rpc': self.rpc,
+            'uid': self.env.uid,
+            'total_ms': round((time.perf_counter() - self._start) * 1000, 3),
+            'queries': self.env.cr.sql_log_count - self._queries,
+            'stages': {
+                name: {'ms': round(elapsed * 1000, 3), 'queries': count}
+                for name, (elapsed, count) in self.stages.items()
+            },
+        }
+        line.update(extra)
+        _logger.debug('%s', json.dumps(line, sort_keys=True, default=str))
+
+
+class _NullTimer:
+
+    def stage(self, name):
+        return nullcontext()
+
+    def flush(self):
+        pass
+
+    def log(self, **extra):
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def stage_timer(rpc, env):
+    """Return a :class:`StageTimer` for ``rpc`` if timing is enabled, else a no-op timer"""
+    if _logger.isEnabledFor(logging.DEBUG):
+        return StageTimer(rpc, env)
+    return NULL_TIMER
@@ -0,0 +1,27 @@
+# tools/tz.py
+import functools
+
+import pytz
+
+DATETIME_FORMAT = '%Y-%m-%d %I:%M:%S %p'
+
+
+@functools.lru_cache(maxsize=64)
+def get_timezone(name):
+    """Return the pytz timezone called ``name``, resolved once per process"""
+    return pytz.timezone(name or 'UTC')
+
+
+@functools.lru_cache(maxsize=64)
+def get_datetime_formatter(name, dt_format=DATETIME_FORMAT):
+    """Return a function rendering naive UTC datetimes in timezone ``name``"""
+    user_tz = get_timezone(name)
+
+    def format_datetime(dt):
+        if not dt:
+            return ''
+        if dt.tzinfo is None:
+            dt = pytz.UTC.localize(dt)
+        return dt.astimezone(user_tz).strftime(dt_format)
+
+    return format_datetime
@@ -0,0 +1,4 @@
+# wizard/__init__.py
+from . import hr_attendance_export_wizard
+from . import hr_attendance_location_assign_wizard
+from . import hr_attendance_location_import_wizard
@@ -0,0 +1,36 @@
+# wizard/hr_attendance_export_wizard.py
+from urllib.parse import urlencode
+
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+
+class HrAttendanceExportWizard(models.TransientModel):
+    _name = 'hr.attendance.export.wizard'
+    _description = 'Attendance Payroll Export'
+
+    date_from = fields.Date(string='From', required=True, default=lambda self: fields.Date.today().replace(day=1))
+    date_to = fields.Date(string='To', required=True, default=fields.Date.today)
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ], string='Format', required=True, default='csv')
+
+    @api.constrains('date_from', 'date_to')
+    def _check_dates(self):
+        for wizard in self:
+            if wizard.date_from > wizard.date_to:
+                raise ValidationError(_('The start date must be before the end date.'))
+
+    def action_export(self):
+        self.ensure_one()
+        query = urlencode({
+            'date_from': fields.Date.to_string(self.date_from),
+            'date_to': fields.Date.to_string(self.date_to),
+            'file_format': self.file_format,
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/ess_zb/attendance/export?%s' % query,
+            'target': 'self',
+        }
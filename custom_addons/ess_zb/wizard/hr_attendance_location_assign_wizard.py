@@ -0,0 +1,59 @@
+# wizard/hr_attendance_location_assign_wizard.py
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+
+class HrAttendanceLocationAssignWizard(models.TransientModel):
+    _name = 'hr.attendance.location.assign.wizard'
+    _description = 'Bulk Attendance Location Assignment'
+
+    location_ids = fields.Many2many(
+        'hr.attendance.location', string='Locations', required=True,
+        default=lambda self: self.env.context.get('active_model') == 'hr.attendance.location'
+        and self.env.context.get('active_ids'))
+    mode = fields.Selection([
+        ('add', 'Assign'),
+        ('remove', 'Unassign'),
+    ], string='Action', required=True, default='add')
+    department_ids = fields.Many2many('hr.department', string='Departments')
+    include_sub_departments = fields.Boolean(string='Include Sub-departments', default=True)
+    category_ids = fields.Many2many('hr.employee.category', string='Tags')
+    company_id = fields.Many2one('res.company', string='Company')
+    employee_count = fields.Integer(string='Matching Employees', compute='_compute_employee_count')
+
+    def _get_employee_domain(self):
+        self.ensure_one()
+        domain = []
+        if self.department_ids:
+            operator = 'child_of' if self.include_sub_departments else 'in'
+            domain.append(('department_id', operator, self.department_ids.ids))
+        if self.category_ids:
+            domain.append(('category_ids', 'in', self.category_ids.ids))
+        if self.company_id:
+            domain.append(('company_id', '=', self.company_id.id))
+        return domain
+
+    @api.depends('department_ids', 'include_sub_departments', 'category_ids', 'company_id')
+    def _compute_employee_count(self):
+        for wizard in self:
+            domain = wizard._get_employee_domain()
+            wizard.employee_count = self.env['hr.employee'].search_count(domain) if domain else 0
+
+    def action_assign(self):
+        self.ensure_one()
+        domain = self._get_employee_domain()
+        if not domain:
+            raise UserError(_('Select at least one department, tag or company.'))
+        employee_ids = self.env['hr.employee'].search(domain).ids
+        self.location_ids._bulk_assign_employees(employee_ids, mode=self.mode)
+        message = _('%(count)s employees assigned.', count=len(employee_ids)) if self.mode == 'add' \
+            else _('%(count)s employees unassigned.', count=len(employee_ids))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': message,
+                'type': 'success',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
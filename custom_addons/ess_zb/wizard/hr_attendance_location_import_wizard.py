@@ -0,0 +1,151 @@
+# wizard/hr_attendance_location_import_wizard.py
+import base64
+import csv
+import io
+import json
+import math
+
+from odoo import models, fields, api, _
+from odoo.exceptions import UserError
+
+from ..tools.geo import Polygon, invalid_circles
+
+# errors listed in the message of a rejected file
+MAX_REPORTED_ERRORS = 20
+
+class HrAttendanceLocationImportWizard(models.TransientModel):
+    _name = 'hr.attendance.location.import.wizard'
+    _description = 'Bulk Attendance Location Import'
+
+    file = fields.Binary(string='File', required=True)
+    filename = fields.Char(string='File Name')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('geojson', 'GeoJSON'),
+    ], string='Format', required=True, default='csv')
+    company_id = fields.Many2one('res.company', string='Company', required=True, default=lambda self: self.env.company)
+    update_existing = fields.Boolean(
+        string='Update Existing Locations', default=True,
+        help='Locations whose code already exists are updated, otherwise they are left untouched.')
+
+    @api.onchange('filename')
+    def _onchange_filename(self):
+        if self.filename and self.filename.lower().endswith(('.geojson', '.json')):
+            self.file_format = 'geojson'
+        elif self.filename and self.filename.lower().endswith('.csv'):
+            self.file_format = 'csv'
+
+    def _parse_float(self, value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return math.nan
+
+    def _read_csv(self, content):
+        """Rows of a CSV file with a ``code,name,latitude,longitude,radius_km[,address]`` header"""
+        reader = csv.DictReader(io.StringIO(content.decode('utf-8-sig')))
+        missing = {'code', 'name', 'latitude', 'longitude'} - set(reader.fieldnames or ())
+        if missing:
+            raise UserError(_('Missing CSV columns: %s', ', '.join(sorted(missing))))
+        return [{
+            'code': (row.get('code') or '').strip(),
+            'name': (row.get('name') or '').strip(),
+            'latitude': self._parse_float(row.get('latitude')),
+            'longitude': self._parse_float(row.get('longitude')),
+            'radius_km': self._parse_float(row.get('radius_km') or 0.5),
+            'geofence_type': 'circle',
+            'polygon_geojson': None,
+            'address': (row.get('address') or '').strip() or None,
+        } for row in reader]
+
+    def _read_geojson(self, content):
+        """Rows of a FeatureCollection of Point or Polygon features
+
+        ``code``, ``name``, ``radius_km`` and ``address`` are read from the
+        feature properties; polygons are referenced at their centroid.
+        """
+        try:
+            collection = json.loads(content)
+            features = collection['features']
+        except (ValueError, TypeError, KeyError):
+            raise UserError(_('The file is not a GeoJSON FeatureCollection.'))
+        rows = []
+        for feature in features:
+            properties = (feature or {}).get('properties') or {}
+            geometry = (feature or {}).get('geometry') or {}
+            radius_km = properties.get('radius_km')
+            row = {
+                'code': str(properties.get('code') or '').strip(),
+                'name': str(properties.get('name') or '').strip(),
+                'latitude': math.nan,
+                'longitude': math.nan,
+                'radius_km': self._parse_float(0.5 if radius_km is None else radius_km),
+                'geofence_type': 'circle',
+                'polygon_geojson': None,
+                'address': properties.get('address') or None,
+            }
+            if geometry.get('type') == 'Point':
+                coordinates = geometry.get('coordinates') or ()
+                if len(coordinates) >= 2:
+                    row['longitude'] = self._parse_float(coordinates[0])
+                    row['latitude'] = self._parse_float(coordinates[1])
+            elif geometry.get('type') == 'Polygon':
+                row['geofence_type'] = 'polygon'
+                row['polygon_geojson'] = json.dumps(geometry)
+            rows.append(row)
+        return rows
+
+    def _validate_rows(self, rows):
+        """Return the errors of the rows, as ``(line, message)`` pairs
+
+        Polygons are parsed first to reference them at their centroid, then
+        coordinates and radii (the ``_check_radius`` rule) are checked in one
+        vectorized pass.
+        """
+        errors = []
+        seen_codes = set()
+        for line, row in enumerate(rows, start=1):
+            if not row['code'] or not row['name']:
+                errors.append((line, _('Code and name are required.')))
+            elif row['code'] in seen_codes:
+                errors.append((line, _('Duplicate code %s.', row['code'])))
+            seen_codes.add(row['code'])
+            if row['geofence_type'] == 'polygon':
+                try:
+                    row['latitude'], row['longitude'] = Polygon.from_geojson(row['polygon_geojson']).centroid
+                except ValueError as e:
+                    errors.append((line, _('Invalid polygon: %s', e)))
+        for position in invalid_circles(
+            [row['latitude'] for row in rows],
+            [row['longitude'] for row in rows],
+            [row['radius_km'] for row in rows],
+        ):
+            if rows[position]['radius_km'] > 0:
+                errors.append((position + 1, _('Invalid coordinates.')))
+            else:
+                errors.append((position + 1, _('Radius must be greater than 0.')))
+        return sorted(errors)
+
+    def action_import(self):
+        self.ensure_one()
+        content = base64.b64decode(self.file or b'')
+        rows = self._read_geojson(content) if self.file_format == 'geojson' else self._read_csv(content)
+        if not rows:
+            raise UserError(_('The file does not contain any location.'))
+        errors = self._validate_rows(rows)
+        if errors:
+            raise UserError(_('No location was imported, the file contains errors:\n%s', '\n'.join(
+                _('Line %(line)s: %(message)s', line=line, message=message)
+                for line, message in errors[:MAX_REPORTED_ERRORS]
+            )))
+        created, updated = self.env['hr.attendance.location']._import_locations(
+            rows, self.company_id.id, update_existing=self.update_existing)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'message': _('%(created)s locations created, %(updated)s updated.', created=created, updated=updated),
+                'type': 'success',
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }